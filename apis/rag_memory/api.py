@@ -2,16 +2,24 @@
 FastAPI application for RAG Memory Service.
 Provides REST API endpoints for memory management and semantic search.
 """
-from typing import List, Optional, Dict, Any
-from fastapi import FastAPI, HTTPException, Query, Path
+from typing import List, Optional, Dict, Any, Set, Iterator, Tuple
+from fastapi import FastAPI, HTTPException, Query, Path, Response, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+import hashlib
+import json
 import logging
+import threading
 
 from rag_service import RagMemoryService
-from models import Memory
+from intent_router import IntentRouter
+from ingest_jobs import IngestWorkerPool, TERMINAL_STATUSES
+from cache import SemanticAnswerCache
+from database import SessionLocal
+from models import Memory, IngestJob
 from config import config
-from openai import OpenAI
+from providers import get_openai_client, warm_up, close_clients
 
 # Configure logging
 logging.basicConfig(level=getattr(logging, config.log_level))
@@ -31,11 +39,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["X-Next-Cursor", "ETag"],  # Let browsers read pagination cursor and ETags
 )
 
 # Initialize RAG service
 rag_service = RagMemoryService()
 
+# Enrichment workers for POST /memories/jobs. Disabled on Lambda, where
+# threads and retry timers are frozen as soon as the response is returned
+ingest_pool = IngestWorkerPool(
+    rag_service=rag_service,
+    session_factory=SessionLocal,
+    workers=config.ingest_workers,
+    max_attempts=config.ingest_max_attempts,
+    retry_backoff=config.ingest_retry_backoff,
+    lease_seconds=config.ingest_lease_seconds,
+) if config.ingest_jobs_enabled else None
+
+@app.on_event("startup")
+def warm_provider_connections():
+    """Open provider connections in the background so the first requests skip the TLS handshake."""
+    if config.provider_warmup:
+        threading.Thread(target=warm_up, name="provider-warmup", daemon=True).start()
+
+@app.on_event("startup")
+def resume_ingest_jobs():
+    """Pick up ingest jobs left unfinished by a previous run."""
+    if ingest_pool is None:
+        return
+    try:
+        ingest_pool.resume_pending()
+    except Exception as e:
+        logger.warning(f"Failed to resume ingest jobs: {e}")
+
+@app.on_event("shutdown")
+def shutdown_background_work():
+    if ingest_pool is not None:
+        ingest_pool.shutdown()
+    close_clients()
+
 # Pydantic models for request/response
 class MemoryCreate(BaseModel):
     text: str = Field(..., description="The text content of the memory")
@@ -70,28 +112,64 @@ class GraphNodeData(BaseModel):
     node: GraphNode
     edges: List[GraphEdge]
 
+MEMORY_RESPONSE_FIELDS = {"id", "text", "category", "source", "created_at", "graph_node"}
+# Graph node labels show this many characters of the memory text
+GRAPH_LABEL_CHARS = 80
+
 class MemoryResponse(BaseModel):
     id: int
-    text: str
-    category: Optional[str]
-    source: Optional[str]
-    created_at: str
+    text: Optional[str] = None
+    category: Optional[str] = None
+    source: Optional[str] = None
+    created_at: Optional[str] = None
     graph_node: Optional[GraphNodeData] = None
 
     @classmethod
-    def from_memory(cls, memory: Memory, graph_node: Optional[GraphNodeData] = None) -> "MemoryResponse":
-        return cls(
-            id=memory.id,
-            text=memory.text,
-            category=memory.category,
-            source=memory.source,
-            created_at=memory.created_at.isoformat() if memory.created_at else "",
-            graph_node=graph_node,
-        )
+    def from_memory(
+        cls,
+        memory: Memory,
+        graph_node: Optional[GraphNodeData] = None,
+        fields: Optional[Set[str]] = None,
+    ) -> "MemoryResponse":
+        """
+        Build a response from a Memory.
+        When fields is given, only those fields are set (id is always included);
+        endpoints using response_model_exclude_unset then omit the rest.
+        """
+        values = {
+            "id": memory.id,
+            "text": memory.text,
+            "category": memory.category,
+            "source": memory.source,
+            "created_at": memory.created_at.isoformat() if memory.created_at else "",
+            "graph_node": graph_node,
+        }
+        if fields is not None:
+            values = {key: value for key, value in values.items() if key == "id" or key in fields}
+        return cls(**values)
+
+class MatchedChunk(BaseModel):
+    chunk_id: int
+    chunk_index: int
+    text: str
+    similarity: float
+    start_word: int
+    end_word: int
+
+class IngestJobResponse(BaseModel):
+    job_id: int
+    memory_id: Optional[int] = None  # None once the memory has been deleted
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    memory: Optional[MemoryResponse] = None  # With its graph node, once the job has succeeded
 
 class SearchResult(BaseModel):
     memory: MemoryResponse
     similarity_score: float
+    chunks: Optional[List[MatchedChunk]] = None
 
 class NeighborResult(BaseModel):
     memory_id: int
@@ -102,6 +180,20 @@ class GraphExport(BaseModel):
     edges: List[Dict[str, Any]]
     metadata: Dict[str, Any]
 
+class BatchSearchRequest(BaseModel):
+    queries: List[str] = Field(..., description="Query texts, embedded together in one request")
+    limit: int = Field(5, description="Maximum number of results per query")
+    category: Optional[str] = Field(None, description="Filter by category")
+    min_similarity: Optional[float] = Field(None, description="Minimum similarity threshold (0.0 to 1.0)")
+    fields: Optional[str] = Field(None, description="Comma-separated memory fields to return (e.g. 'id,category')")
+    preview_chars: Optional[int] = Field(None, ge=1, description="Truncate memory text to this many characters")
+    ef_search: Optional[int] = Field(None, description="HNSW ef_search for this request")
+    probes: Optional[int] = Field(None, description="IVFFlat probes for this request")
+
+class BatchSearchResult(BaseModel):
+    query: str
+    results: List[SearchResult]
+
 class ProcessRequest(BaseModel):
     text: str = Field(..., description="User input text, possibly from audio transcription")
     category: Optional[str] = Field(None, description="Optional category hint")
@@ -111,13 +203,89 @@ class ProcessRequest(BaseModel):
         description="Optional forced action: 'save' or 'ask'. When set, bypasses intent routing"
     )
 
-def _decide_intent_via_tool_call(text: str) -> str:
+def _parse_fields(fields: Optional[str]) -> Optional[Set[str]]:
+    """
+    Parse a comma-separated fields= projection parameter.
+    
+    Returns:
+        Set of requested field names, or None if no projection was requested
+        
+    Raises:
+        HTTPException: If an unknown field is requested
+    """
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - MEMORY_RESPONSE_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(MEMORY_RESPONSE_FIELDS))}",
+        )
+    return requested
+
+def _text_options(
+    fields: Optional[Set[str]],
+    include_graph: bool,
+    preview_chars: Optional[int],
+) -> Tuple[bool, Optional[int]]:
+    """
+    Return (include_text, preview_chars) for loading memories. Graph node labels
+    need a text preview even when the text field itself is not returned.
+    """
+    if fields is None or "text" in fields:
+        return True, preview_chars
+    if include_graph or "graph_node" in fields:
+        return True, GRAPH_LABEL_CHARS
+    return False, preview_chars
+
+def _memory_responses(
+    memories: List[Memory],
+    fields: Optional[Set[str]] = None,
+    include_graph: bool = False,
+) -> List[MemoryResponse]:
+    """
+    Build list responses, attaching graph nodes in one batch when requested
+    via include_graph or fields=graph_node.
+    """
+    if include_graph or (fields is not None and "graph_node" in fields):
+        graph_nodes = _build_graph_nodes(memories)
+        return [
+            MemoryResponse.from_memory(memory, graph_node=graph_nodes[memory.id], fields=fields)
+            for memory in memories
+        ]
+    return [MemoryResponse.from_memory(memory, fields=fields) for memory in memories]
+
+def _memory_etag(memory: Memory) -> str:
+    """
+    ETag for a memory, derived from its ID and last modification time.
+    Every write path that changes a memory bumps updated_at.
+    """
+    modified_at = memory.updated_at or memory.created_at
+    version = int(modified_at.timestamp() * 1_000_000) if modified_at else 0
+    return f'"m{memory.id}-{version}"'
+
+def _neighbors_etag(memory_id: int, neighbors: List[Any]) -> str:
+    """ETag for a neighbor list, derived from its content."""
+    digest = hashlib.blake2b(repr(neighbors).encode("utf-8"), digest_size=8).hexdigest()
+    return f'"n{memory_id}-{digest}"'
+
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Check an If-None-Match header (weak comparison) against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+def _decide_intent_via_tool_call(text: str) -> Optional[str]:
     """
     Pure tool-calling: force a single choice between 'save_memory' and 'answer_question'.
-    Returns 'save' or 'ask'. Defaults to 'save' on failure.
+    Returns 'save' or 'ask', or None on failure (the router then falls back to 'save').
     """
     try:
-        client = OpenAI()
+        client = get_openai_client()
         tools = [
             {
                 "type": "function",
@@ -168,105 +336,207 @@ def _decide_intent_via_tool_call(text: str) -> str:
                 return "ask"
             if name == "save_memory":
                 return "save"
-        return "save"
+        return None
     except Exception as e:
         logger.warning(f"Tool-calling decision failed: {e}")
-        return "save"
+        return None
+
+# Local first stage for /process routing; the tool call above is the fallback.
+# Examples are loaded by the startup hook below, not at import time
+intent_router = IntentRouter(
+    embedding_generator=rag_service.embedding_generator,
+    llm_decider=_decide_intent_via_tool_call,
+    session_factory=SessionLocal,
+    k=config.intent_router_k,
+    min_examples=config.intent_router_min_examples,
+    confidence_threshold=config.intent_router_confidence,
+    max_examples=config.intent_router_max_examples,
+    audit_rate=config.intent_router_audit_rate,
+    load_examples=False,
+)
+
+def _load_intent_examples():
+    try:
+        intent_router.load_examples()
+    except Exception as e:
+        logger.warning(f"Failed to load intent routing examples: {e}")
+
+@app.on_event("startup")
+def load_intent_router():
+    """
+    Load the router's examples in the background (this may embed stored
+    decisions). Until then the classifier abstains and requests use the LLM.
+    """
+    if config.intent_router_enabled:
+        threading.Thread(target=_load_intent_examples, name="intent-router-load", daemon=True).start()
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting prompts."""
+    return max(1, len(text) // 4)
+
+def _pack_answer_context(results: List[Any], token_budget: int) -> List[str]:
+    """
+    Pick the best-matching chunks across all results until the token budget is spent.
+    results: List of (Memory, similarity_score, matched_chunks); results without
+    matched chunks contribute their (truncated) memory text instead.
+    """
+    candidates = []
+    for result in results:
+        memory, score = result[0], result[1]
+        chunks = result[2] if len(result) > 2 else None
+        if chunks:
+            candidates.extend((chunk["similarity"], chunk["text"]) for chunk in chunks)
+        elif memory.text:
+            candidates.append((score, memory.text[:600]))
+    candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+    snippets = []
+    remaining = token_budget
+    for similarity, snippet in candidates:
+        cost = _estimate_tokens(snippet)
+        if cost > remaining:
+            continue
+        snippets.append(f"- (sim={similarity:.2f}) {snippet}")
+        remaining -= cost
+    return snippets
+
+ANSWER_FALLBACK = "No pude generar una respuesta con el contexto disponible."
+
+def _answer_messages(query: str, results: List[Any]) -> List[Dict[str, str]]:
+    """
+    Chat messages asking for an answer to `query` from the retrieved RAG context.
+    results: List of (Memory, similarity_score, matched_chunks), packed up to
+    config.answer_context_tokens
+    """
+    context_snippets = _pack_answer_context(results, config.answer_context_tokens)
+    context_block = "\n".join(context_snippets) if context_snippets else "No context available."
+
+    system_prompt = (
+        "Eres un asistente que responde en español de forma breve y directa.\n"
+        "Usa SOLO el contexto proporcionado. Si no hay suficiente contexto, dilo explícitamente y sugiere guardarlo."
+    )
+    user_prompt = (
+        f"Pregunta del usuario:\n{query}\n\n"
+        f"Contexto relevante:\n{context_block}\n\n"
+        "Responde en 2-4 frases, citando brevemente de dónde sale si aplica."
+    )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
 
 def _generate_answer_with_context(query: str, results: List[Any]) -> str:
     """
     Minimal answer generation using OpenAI with retrieved RAG context.
-    results: List of (Memory, similarity_score)
+    results: List of (Memory, similarity_score, matched_chunks)
     """
     try:
-        client = OpenAI()
-        context_snippets = []
-        for memory, score in results[:3]:
-            snippet = memory.text
-            if len(snippet) > 600:
-                snippet = snippet[:600] + "..."
-            context_snippets.append(f"- (sim={score:.2f}) {snippet}")
-        context_block = "\n".join(context_snippets) if context_snippets else "No context available."
-
-        system_prompt = (
-            "Eres un asistente que responde en español de forma breve y directa.\n"
-            "Usa SOLO el contexto proporcionado. Si no hay suficiente contexto, dilo explícitamente y sugiere guardarlo."
-        )
-        user_prompt = (
-            f"Pregunta del usuario:\n{query}\n\n"
-            f"Contexto relevante:\n{context_block}\n\n"
-            "Responde en 2-4 frases, citando brevemente de dónde sale si aplica."
-        )
+        client = get_openai_client()
         resp = client.chat.completions.create(
             model="gpt-5",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
+            messages=_answer_messages(query, results),
             temperature=0.2,
             max_tokens=300,
         )
         return (resp.choices[0].message.content or "").strip()
     except Exception as e:
         logger.error(f"Answer generation failed: {e}")
-        return "No pude generar una respuesta con el contexto disponible."
+        return ANSWER_FALLBACK
 
-def _build_graph_node_data(memory: Memory, limit: int = 10) -> GraphNodeData:
+def _stream_answer_with_context(
+    query: str,
+    results: List[Any],
+    outcome: Optional[Dict[str, bool]] = None,
+) -> Iterator[str]:
     """
-    Build GraphNodeData for a given memory including its neighbors.
+    Same as _generate_answer_with_context, yielding answer text as it is generated.
     
-    Args:
-        memory: The Memory object
-        limit: Maximum number of neighbors to include
-        
-    Returns:
-        GraphNodeData with node and edges
+    If generation fails, possibly after some text was already yielded, the
+    fallback message is yielded and outcome["failed"] is set, so callers can
+    tell a complete answer from a partial one.
     """
+    outcome = outcome if outcome is not None else {}
+    outcome["failed"] = False
     try:
-        # Get neighbors from the RAG service
-        neighbors = rag_service.get_memory_neighbors(memory_id=memory.id, limit=limit)
-        
-        # Format the text for label
-        text = memory.text or ""
-        label = (text[:80] + "...") if len(text) > 80 else text
-        
-        # Build the node
-        graph_node = GraphNode(
-            id=str(memory.id),
-            label=label,
-            type="memory",
-            category=memory.category,
-            created_at=memory.created_at.isoformat() if memory.created_at else None,
+        client = get_openai_client()
+        stream = client.chat.completions.create(
+            model="gpt-5",
+            messages=_answer_messages(query, results),
+            temperature=0.2,
+            max_tokens=300,
+            stream=True,
         )
-        
-        # Build the edges
-        edges = [
-            GraphEdge(
-                source=str(memory.id),
-                target=str(neighbor_id),
-                weight=score,
-            )
-            for neighbor_id, score in neighbors
-        ]
-        
-        return GraphNodeData(node=graph_node, edges=edges)
-        
+        produced = False
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                produced = True
+                yield delta
+        if not produced:
+            outcome["failed"] = True
+            yield ANSWER_FALLBACK
     except Exception as e:
-        logger.error(f"Error building graph node data for memory {memory.id}: {e}")
-        # Return a basic node structure even if we can't get neighbors
-        text = memory.text or ""
-        label = (text[:80] + "...") if len(text) > 80 else text
+        logger.error(f"Streaming answer generation failed: {e}")
+        outcome["failed"] = True
+        yield ANSWER_FALLBACK
+
+def _sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _build_graph_nodes(memories: List[Memory], limit: int = 10) -> Dict[int, GraphNodeData]:
+    """
+    Build GraphNodeData for a page of memories, resolving all neighbors
+    with a single graph-store call.
+    
+    Models are built with model_construct since every value comes from
+    trusted, already-typed data; validation would dominate large pages.
+    
+    Args:
+        memories: The Memory objects
+        limit: Maximum number of neighbors to include per memory
         
-        return GraphNodeData(
-            node=GraphNode(
-                id=str(memory.id),
-                label=label,
+    Returns:
+        Dictionary mapping memory ID to its GraphNodeData
+    """
+    neighbors_by_id = rag_service.get_memory_neighbors_batch(
+        memory_ids=[memory.id for memory in memories],
+        limit=limit,
+    )
+    
+    graph_nodes = {}
+    for memory in memories:
+        memory_id = str(memory.id)
+        text = memory.text or ""
+        graph_nodes[memory.id] = GraphNodeData.model_construct(
+            node=GraphNode.model_construct(
+                id=memory_id,
+                label=(text[:GRAPH_LABEL_CHARS] + "...") if len(text) > GRAPH_LABEL_CHARS else text,
                 type="memory",
                 category=memory.category,
                 created_at=memory.created_at.isoformat() if memory.created_at else None,
             ),
-            edges=[]
+            edges=[
+                GraphEdge.model_construct(source=memory_id, target=str(neighbor_id), weight=score)
+                for neighbor_id, score in neighbors_by_id.get(memory.id, [])
+            ],
         )
+    return graph_nodes
+
+def _build_graph_node_data(memory: Memory, limit: int = 10) -> GraphNodeData:
+    """
+    Build GraphNodeData for a given memory including its neighbors.
+    
+    Args:
+        memory: The Memory object
+        limit: Maximum number of neighbors to include
+        
+    Returns:
+        GraphNodeData with node and edges
+    """
+    return _build_graph_nodes([memory], limit=limit)[memory.id]
 
 # Health check endpoint
 @app.get("/health")
@@ -296,6 +566,111 @@ async def create_memory(memory_data: MemoryCreate):
         logger.error(f"Error creating memory: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def _require_ingest_pool() -> IngestWorkerPool:
+    """The ingest worker pool, or a 501 if background ingestion is disabled (e.g. on Lambda)."""
+    if ingest_pool is None:
+        raise HTTPException(
+            status_code=501,
+            detail="Background ingestion is disabled on this deployment; use POST /memories",
+        )
+    return ingest_pool
+
+def _ingest_job_response(job: IngestJob) -> IngestJobResponse:
+    """Build a job status response, including the enriched memory once it succeeded."""
+    memory = None
+    if job.status == "succeeded" and job.memory_id is not None:
+        stored = rag_service.get_memory(job.memory_id)
+        if stored is not None:
+            memory = MemoryResponse.from_memory(stored, graph_node=_build_graph_node_data(stored, limit=10))
+    return IngestJobResponse(
+        job_id=job.id,
+        memory_id=job.memory_id,
+        status=job.status,
+        attempts=job.attempts or 0,
+        error=job.error,
+        created_at=job.created_at.isoformat() if job.created_at else None,
+        finished_at=job.finished_at.isoformat() if job.finished_at else None,
+        memory=memory,
+    )
+
+@app.post("/memories/jobs", response_model=IngestJobResponse, status_code=202)
+async def create_memory_job(memory_data: MemoryCreate):
+    """
+    Store a memory now and enrich it in the background.
+    Only the raw text is written before responding; categorization, embedding
+    and graph linking run on the ingest workers. Follow progress with
+    GET /jobs/{job_id} or GET /jobs/{job_id}/events.
+    Not available on Lambda (see config.ingest_jobs_enabled).
+    """
+    try:
+        pool = _require_ingest_pool()
+        job = rag_service.add_memory_deferred(
+            text=memory_data.text,
+            category=memory_data.category,
+            source=memory_data.source,
+            auto_categorize=memory_data.auto_categorize,
+        )
+        pool.submit(job.id)
+        return _ingest_job_response(job)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error creating memory job: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_memory_job(job_id: int = Path(..., description="Ingest job ID")):
+    """Get the status of an ingest job (and the memory with its graph node once done)."""
+    try:
+        job = _require_ingest_pool().get_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return _ingest_job_response(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting job {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/jobs/{job_id}/events")
+async def stream_memory_job(job_id: int = Path(..., description="Ingest job ID")):
+    """
+    Follow an ingest job as server-sent events.
+    Emits a 'status' event with the job (see GET /jobs/{job_id}) whenever its
+    status or attempt count changes; the stream ends once the job has
+    succeeded or failed.
+    """
+    pool = _require_ingest_pool()
+    job = pool.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    def events() -> Iterator[str]:
+        current = job
+        last_state = None
+        try:
+            while current is not None:
+                state = (current.status, current.attempts)
+                if state != last_state:
+                    last_state = state
+                    yield _sse_event("status", _ingest_job_response(current).model_dump())
+                if current.status in TERMINAL_STATUSES:
+                    return
+                # Woken early by jobs run in this process; polling covers the others
+                pool.wait_for_change(timeout=config.ingest_event_poll_interval)
+                current = pool.get_job(job_id)
+        except Exception as e:
+            logger.error(f"Error streaming job {job_id}: {e}")
+            yield _sse_event("error", {"detail": "Internal server error"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.post("/memories/batch", response_model=List[MemoryResponse])
 async def create_memories_batch(batch_data: MemoryBatchCreate):
     """Create multiple memories in batch."""
@@ -314,13 +689,23 @@ async def create_memories_batch(batch_data: MemoryBatchCreate):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/memories/{memory_id}", response_model=MemoryResponse)
-async def get_memory(memory_id: int = Path(..., description="Memory ID")):
-    """Get a memory by ID."""
+async def get_memory(
+    response: Response,
+    memory_id: int = Path(..., description="Memory ID"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Get a memory by ID. Supports conditional requests via ETag/If-None-Match."""
     try:
         memory = rag_service.get_memory(memory_id)
         if not memory:
             raise HTTPException(status_code=404, detail="Memory not found")
+        etag = _memory_etag(memory)
+        if _etag_matches(etag, if_none_match):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
         return MemoryResponse.from_memory(memory)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting memory {memory_id}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -363,20 +748,49 @@ async def delete_memory(memory_id: int = Path(..., description="Memory ID")):
         logger.error(f"Error deleting memory {memory_id}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.get("/memories", response_model=List[MemoryResponse])
+@app.get("/memories", response_model=List[MemoryResponse], response_model_exclude_unset=True)
 async def get_all_memories(
+    response: Response,
     limit: Optional[int] = Query(None, description="Maximum number of memories to return"),
-    offset: int = Query(0, description="Number of memories to skip"),
+    offset: int = Query(0, description="Number of memories to skip (prefer cursor for deep pages)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
     category: Optional[str] = Query(None, description="Filter by category"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. 'id,category,created_at')"),
+    preview_chars: Optional[int] = Query(None, ge=1, description="Truncate text to this many characters"),
+    include_graph: bool = Query(False, description="Include each memory's graph node and edges"),
 ):
-    """Get all memories with optional filtering and pagination."""
+    """
+    Get all memories with optional filtering and pagination.
+    
+    When a limit is given (and no offset), keyset pagination is used and the
+    cursor for the next page is returned in the X-Next-Cursor header.
+    """
     try:
-        memories = rag_service.get_all_memories(
-            limit=limit,
-            offset=offset,
-            category=category,
-        )
-        return [MemoryResponse.from_memory(memory) for memory in memories]
+        requested_fields = _parse_fields(fields)
+        include_text, text_chars = _text_options(requested_fields, include_graph, preview_chars)
+        if cursor or (limit and not offset):
+            memories, next_cursor = rag_service.get_memories_page(
+                limit=limit or config.default_search_limit,
+                cursor=cursor,
+                category=category,
+                preview_chars=text_chars,
+                include_text=include_text,
+            )
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+        else:
+            memories = rag_service.get_all_memories(
+                limit=limit,
+                offset=offset,
+                category=category,
+                preview_chars=text_chars,
+                include_text=include_text,
+            )
+        return _memory_responses(memories, requested_fields, include_graph)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting memories: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -394,22 +808,35 @@ async def count_memories(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Search endpoints
-@app.get("/search", response_model=List[SearchResult])
+@app.get("/search", response_model=List[SearchResult], response_model_exclude_unset=True)
 async def search_memories(
     query: str = Query(..., description="Search query text"),
     limit: int = Query(5, description="Maximum number of results"),
     category: Optional[str] = Query(None, description="Filter by category"),
     min_similarity: Optional[float] = Query(None, description="Minimum similarity threshold (0.0 to 1.0)"),
-    enhance_query: bool = Query(True, description="Whether to use AI-powered query enhancement"),
+    enhance_query: Optional[bool] = Query(None, description="Whether to use AI-powered query enhancement (default: off for hybrid mode, on otherwise)"),
     query_context: Optional[str] = Query(None, description="JSON string with recent conversation context for better enhancement"),
+    fields: Optional[str] = Query(None, description="Comma-separated memory fields to return (e.g. 'id,category')"),
+    preview_chars: Optional[int] = Query(None, ge=1, description="Truncate memory text to this many characters"),
+    ef_search: Optional[int] = Query(None, description="HNSW ef_search for this request (higher = better recall, slower)"),
+    probes: Optional[int] = Query(None, description="IVFFlat probes for this request (higher = better recall, slower)"),
+    mode: Optional[str] = Query(None, description="'vector', 'hybrid' (vector + full-text, rank-fused scores), 'hierarchical' (memories, then their chunks) or 'graph' (vector hits expanded by personalized PageRank); defaults to config"),
+    candidates: Optional[int] = Query(None, ge=1, description="Memories kept by the first stage of hierarchical search"),
+    mmr_lambda: Optional[float] = Query(None, ge=0.0, le=1.0, description="Diversify results with MMR (1.0 = pure relevance, lower = more diverse)"),
+    mmr_pool: Optional[int] = Query(None, ge=1, description="Candidates considered by the MMR rerank"),
+    include_chunks: bool = Query(False, description="Include each memory's best-matching chunks with word offsets"),
 ):
     """Search for memories similar to the query text."""
     try:
+        requested_fields = _parse_fields(fields)
+        search_mode = mode or config.default_search_mode
+        if enhance_query is None:
+            # Full-text matching covers what the rewrite is mostly for (exact terms)
+            enhance_query = search_mode != "hybrid"
         # Parse query context if provided
         context_list = None
         if query_context:
             try:
-                import json
                 context_list = json.loads(query_context)
             except json.JSONDecodeError:
                 logger.warning(f"Invalid query_context JSON: {query_context}")
@@ -421,29 +848,97 @@ async def search_memories(
             min_similarity=min_similarity,
             enhance_query=enhance_query,
             query_context=context_list,
+            preview_chars=preview_chars,
+            include_text=requested_fields is None or "text" in requested_fields,
+            ef_search=ef_search,
+            probes=probes,
+            search_mode=search_mode,
+            candidate_memories=candidates,
+            mmr_lambda=mmr_lambda,
+            mmr_pool=mmr_pool,
+            include_chunks=include_chunks,
         )
+        if include_chunks:
+            return [
+                SearchResult(
+                    memory=MemoryResponse.from_memory(memory, fields=requested_fields),
+                    similarity_score=score,
+                    chunks=[MatchedChunk(**chunk) for chunk in chunks],
+                )
+                for memory, score, chunks in results
+            ]
         return [
             SearchResult(
-                memory=MemoryResponse.from_memory(memory),
+                memory=MemoryResponse.from_memory(memory, fields=requested_fields),
                 similarity_score=score,
             )
             for memory, score in results
         ]
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error searching memories: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.get("/search/category/{category}", response_model=List[MemoryResponse])
+@app.post("/search/batch", response_model=List[BatchSearchResult], response_model_exclude_unset=True)
+async def search_memories_batch(request: BatchSearchRequest):
+    """Search for several queries in one call (one embedding request, one ANN query)."""
+    try:
+        requested_fields = _parse_fields(request.fields)
+        batch_results = rag_service.search_batch(
+            queries=request.queries,
+            limit=request.limit,
+            category=request.category,
+            min_similarity=request.min_similarity,
+            preview_chars=request.preview_chars,
+            include_text=requested_fields is None or "text" in requested_fields,
+            ef_search=request.ef_search,
+            probes=request.probes,
+        )
+        return [
+            BatchSearchResult(
+                query=query,
+                results=[
+                    SearchResult(
+                        memory=MemoryResponse.from_memory(memory, fields=requested_fields),
+                        similarity_score=score,
+                    )
+                    for memory, score in results
+                ],
+            )
+            for query, results in zip(request.queries, batch_results)
+        ]
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in batch search: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/search/category/{category}", response_model=List[MemoryResponse], response_model_exclude_unset=True)
 async def search_by_category(
     category: str = Path(..., description="Category to search for"),
     limit: Optional[int] = Query(None, description="Maximum number of results"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. 'id,created_at')"),
+    preview_chars: Optional[int] = Query(None, ge=1, description="Truncate text to this many characters"),
+    include_graph: bool = Query(False, description="Include each memory's graph node and edges"),
 ):
     """Search memories by category."""
     try:
-        memories = rag_service.search_by_category(category=category, limit=limit)
-        return [MemoryResponse.from_memory(memory) for memory in memories]
+        requested_fields = _parse_fields(fields)
+        include_text, text_chars = _text_options(requested_fields, include_graph, preview_chars)
+        memories = rag_service.search_by_category(
+            category=category,
+            limit=limit,
+            preview_chars=text_chars,
+            include_text=include_text,
+        )
+        return _memory_responses(memories, requested_fields, include_graph)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error searching by category: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -454,14 +949,12 @@ async def get_all_categories():
     try:
         from category_detector import CATEGORIES
         
-        category_counts = []
-        for category in CATEGORIES:
-            count = rag_service.count_memories(category=category)
-            if count > 0:
-                category_counts.append({
-                    "category": category,
-                    "count": count
-                })
+        counts = rag_service.get_category_counts()
+        category_counts = [
+            {"category": category, "count": counts[category]}
+            for category in CATEGORIES
+            if counts.get(category, 0) > 0
+        ]
         
         return {
             "categories": CATEGORIES,
@@ -474,12 +967,18 @@ async def get_all_categories():
 # Graph endpoints
 @app.get("/memories/{memory_id}/neighbors", response_model=List[NeighborResult])
 async def get_memory_neighbors(
+    response: Response,
     memory_id: int = Path(..., description="Memory ID"),
     limit: int = Query(5, description="Maximum number of neighbors"),
+    if_none_match: Optional[str] = Header(None),
 ):
-    """Get the most similar neighbors of a memory."""
+    """Get the most similar neighbors of a memory. Supports ETag/If-None-Match."""
     try:
         neighbors = rag_service.get_memory_neighbors(memory_id=memory_id, limit=limit)
+        etag = _neighbors_etag(memory_id, neighbors)
+        if _etag_matches(etag, if_none_match):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
         return [
             NeighborResult(memory_id=neighbor_id, similarity_score=score)
             for neighbor_id, score in neighbors
@@ -488,6 +987,45 @@ async def get_memory_neighbors(
         logger.error(f"Error getting neighbors for memory {memory_id}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/memories/{memory_id}/similar", response_model=List[SearchResult], response_model_exclude_unset=True)
+async def get_similar_memories(
+    memory_id: int = Path(..., description="Memory ID"),
+    limit: int = Query(5, description="Maximum number of results"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    min_similarity: Optional[float] = Query(None, description="Minimum similarity threshold (0.0 to 1.0)"),
+    method: str = Query("centroid", description="'centroid' (memory summary vector) or 'chunks' (best chunk pair)"),
+    fields: Optional[str] = Query(None, description="Comma-separated memory fields to return (e.g. 'id,category')"),
+    preview_chars: Optional[int] = Query(None, ge=1, description="Truncate memory text to this many characters"),
+):
+    """Find memories similar to a stored one using its stored embeddings (no embedding call)."""
+    try:
+        requested_fields = _parse_fields(fields)
+        results = rag_service.find_similar_to_memory(
+            memory_id=memory_id,
+            limit=limit,
+            category=category,
+            min_similarity=min_similarity,
+            method=method,
+            preview_chars=preview_chars,
+            include_text=requested_fields is None or "text" in requested_fields,
+        )
+        if results is None:
+            raise HTTPException(status_code=404, detail="Memory not found")
+        return [
+            SearchResult(
+                memory=MemoryResponse.from_memory(memory, fields=requested_fields),
+                similarity_score=score,
+            )
+            for memory, score in results
+        ]
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error finding memories similar to {memory_id}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.get("/memories/{memory_id}/cluster", response_model=List[int])
 async def get_memory_cluster(memory_id: int = Path(..., description="Memory ID")):
     """Get all memories in the same cluster as the given memory."""
@@ -515,10 +1053,13 @@ async def find_path_between_memories(
 
 # Statistics and export endpoints
 @app.get("/statistics")
-async def get_graph_statistics():
+async def get_graph_statistics(
+    approximate: bool = Query(False, description="Use catalog estimates instead of exact recounts when counters are cold"),
+):
     """Get statistics about the memory graph."""
     try:
-        stats = rag_service.get_graph_statistics()
+        stats = rag_service.get_graph_statistics(approximate=approximate)
+        stats["answer_cache"] = answer_cache.get_stats()
         return stats
     except Exception as e:
         logger.error(f"Error getting statistics: {e}")
@@ -547,6 +1088,144 @@ async def rebuild_graph():
         logger.error(f"Error rebuilding graph: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/vector-index")
+async def get_vector_index():
+    """Describe the vector index on memory chunk embeddings."""
+    try:
+        info = rag_service.get_vector_index_info()
+        if not info:
+            raise HTTPException(status_code=404, detail="Vector index not found")
+        return info
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting vector index info: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.post("/rebuild-vector-index")
+def rebuild_vector_index(
+    method: Optional[str] = Query(None, description="Index method: 'hnsw' or 'ivfflat' (defaults to config)"),
+):
+    """
+    Rebuild the vector indexes concurrently with parameters scaled to the data size.
+    
+    A plain def, so the build (minutes on large tables) runs in the threadpool
+    and other requests keep being served. Not available on Lambda, where the
+    gateway timeout would cut the build off and leave an invalid index behind.
+    """
+    if config.running_on_lambda:
+        raise HTTPException(
+            status_code=501,
+            detail="Index rebuilds are not supported on Lambda; run them from a long-running server or psql",
+        )
+    try:
+        info = rag_service.rebuild_vector_index(method=method)
+        return {"message": "Vector index rebuilt successfully", "index": info}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error rebuilding vector index: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+def _decide_intent(text: str, force_action: Optional[str]) -> Tuple[str, str]:
+    """Return (intent, decider) for /process input."""
+    if force_action in {"save", "ask"}:
+        # Explicit user choices are trusted labels for the local router
+        intent_router.record(text, force_action, "override")
+        return force_action, "override"
+    if not config.intent_router_enabled:
+        intent = _decide_intent_via_tool_call(text)
+        return intent or "save", "tool_calling"
+    return intent_router.decide(text)
+
+def _search_for_answer(text: str, category: Optional[str]) -> List[Any]:
+    """Retrieve the context used to answer an 'ask' request."""
+    return rag_service.search_similar_by_text(
+        query_text=text,
+        limit=5,
+        category=category,
+        # Hybrid search finds exact terms without the LLM rewrite
+        enhance_query=config.default_search_mode != "hybrid",
+        search_mode=config.default_search_mode,
+        # Avoid spending the answer's context slots on near-duplicate memories
+        mmr_lambda=config.answer_mmr_lambda,
+        # Answers are built from the matched chunks, not whole memories
+        include_chunks=True,
+    )
+
+# Answers to /process questions, reused for near-identical questions
+answer_cache = SemanticAnswerCache(
+    max_size=config.answer_cache_size,
+    similarity_threshold=config.answer_cache_similarity,
+)
+
+def _answer_sources(results: List[Any]) -> List[Dict[str, Any]]:
+    """Serialized sources of an answer."""
+    return [
+        {
+            "memory": MemoryResponse.from_memory(mem).model_dump(),
+            "similarity_score": score,
+        }
+        for (mem, score, _chunks) in results
+    ]
+
+def _question_embedding(text: str) -> Optional[List[float]]:
+    """Embedding used as the answer cache key (None if it can't be computed)."""
+    if config.answer_cache_size <= 0:
+        return None
+    try:
+        # Usually an embedding cache hit: routing and search embed the same text
+        return rag_service.embedding_generator.generate_embedding(text)
+    except Exception as e:
+        logger.warning(f"Answer cache lookup skipped: {e}")
+        return None
+
+def _get_cached_answer(question_embedding: Optional[List[float]], category: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Cached answer for a similar question, if none of its source memories
+    changed (or were deleted) since it was generated.
+    """
+    if question_embedding is None:
+        return None
+    entry = answer_cache.get(question_embedding, scope=category)
+    if entry is None:
+        return None
+    if rag_service.get_memory_versions(list(entry["versions"])) != entry["versions"]:
+        answer_cache.discard(entry)
+        return None
+    return entry
+
+def _cache_answer(
+    question_embedding: Optional[List[float]],
+    category: Optional[str],
+    results: List[Any],
+    answer: str,
+):
+    """Remember an answer with the versions of the memories it was built from."""
+    # Answers without sources or from a failed generation aren't worth reusing
+    if question_embedding is None or not results or answer in ("", ANSWER_FALLBACK):
+        return
+    answer_cache.put(
+        question_embedding,
+        {
+            "answer": answer,
+            "sources": _answer_sources(results),
+            "versions": {mem.id: mem.updated_at or mem.created_at for (mem, _score, _chunks) in results},
+        },
+        scope=category,
+    )
+
+@app.get("/intent-router")
+async def get_intent_router_metrics():
+    """Local intent routing statistics: decisions per stage, latency and audited accuracy."""
+    try:
+        metrics = intent_router.get_metrics()
+        metrics["enabled"] = config.intent_router_enabled
+        return metrics
+    except Exception as e:
+        logger.error(f"Error getting intent router metrics: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.post("/process")
 async def process_input(request: ProcessRequest):
     """
@@ -560,13 +1239,7 @@ async def process_input(request: ProcessRequest):
         if not text:
             raise HTTPException(status_code=400, detail="Text cannot be empty")
 
-        # Decide intent
-        if request.force_action in {"save", "ask"}:
-            intent = request.force_action
-            decider = "override"
-        else:
-            intent = _decide_intent_via_tool_call(text)
-            decider = "tool_calling"
+        intent, decider = _decide_intent(text, request.force_action)
 
         if intent == "save":
             # Auto-categorize is enabled by default in the RAG service
@@ -583,28 +1256,31 @@ async def process_input(request: ProcessRequest):
                 "memory": MemoryResponse.from_memory(memory),
             }
         else:
-            results = rag_service.search_similar_by_text(
-                query_text=text,
-                limit=5,
-                category=request.category,
-                enhance_query=True,  # Enable query enhancement by default
-            )
+            question_embedding = _question_embedding(text)
+            cached = _get_cached_answer(question_embedding, request.category)
+            if cached is not None:
+                return {
+                    "action": "answered",
+                    "intent": "ask",
+                    "decider": decider,
+                    "answer": cached["answer"],
+                    "sources": cached["sources"],
+                    "cached": True,
+                }
+
+            results = _search_for_answer(text, request.category)
             answer = _generate_answer_with_context(
                 query=text,
                 results=results,
             )
+            _cache_answer(question_embedding, request.category, results, answer)
             return {
                 "action": "answered",
                 "intent": "ask",
                 "decider": decider,
                 "answer": answer,
-                "sources": [
-                    {
-                        "memory": MemoryResponse.from_memory(mem),
-                        "similarity_score": score,
-                    }
-                    for (mem, score) in results
-                ],
+                "sources": _answer_sources(results),
+                "cached": False,
             }
     except HTTPException:
         raise
@@ -612,6 +1288,78 @@ async def process_input(request: ProcessRequest):
         logger.error(f"Error processing input: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.post("/process/stream")
+async def process_input_stream(request: ProcessRequest):
+    """
+    Streaming variant of /process, as server-sent events.
+    Events:
+    - intent: {"intent", "decider"} once routing is decided
+    - saved: the stored memory (save intent; the stream ends there)
+    - sources: retrieved memories, as soon as search completes (ask intent)
+    - token: {"text"} answer fragments as they are generated
+    - done: {"answer", "cached"} the full answer (a cached answer arrives as a single token)
+    - error: {"detail"} if processing fails after the stream has started
+    
+    Not available on Lambda: Mangum buffers the whole response, so streaming
+    would bring no time-to-first-byte gain there.
+    """
+    if config.running_on_lambda:
+        raise HTTPException(
+            status_code=501,
+            detail="Streaming is not supported on Lambda (responses are buffered); use POST /process",
+        )
+    text = (request.text or "").strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="Text cannot be empty")
+
+    def events() -> Iterator[str]:
+        try:
+            intent, decider = _decide_intent(text, request.force_action)
+            yield _sse_event("intent", {"intent": intent, "decider": decider})
+
+            if intent == "save":
+                memory = rag_service.add_memory(
+                    text=text,
+                    category=request.category,
+                    source=request.source,
+                    auto_categorize=True,
+                )
+                yield _sse_event("saved", {"memory": MemoryResponse.from_memory(memory).model_dump()})
+                return
+
+            question_embedding = _question_embedding(text)
+            cached = _get_cached_answer(question_embedding, request.category)
+            if cached is not None:
+                yield _sse_event("sources", cached["sources"])
+                yield _sse_event("token", {"text": cached["answer"]})
+                yield _sse_event("done", {"answer": cached["answer"], "cached": True})
+                return
+
+            results = _search_for_answer(text, request.category)
+            yield _sse_event("sources", _answer_sources(results))
+
+            answer_parts = []
+            outcome: Dict[str, bool] = {}
+            for delta in _stream_answer_with_context(query=text, results=results, outcome=outcome):
+                answer_parts.append(delta)
+                yield _sse_event("token", {"text": delta})
+            answer = "".join(answer_parts).strip()
+            # A stream cut off midway leaves partial text plus the fallback message
+            if not outcome["failed"]:
+                _cache_answer(question_embedding, request.category, results, answer)
+            yield _sse_event("done", {"answer": answer, "cached": False})
+        except Exception as e:
+            logger.error(f"Error processing streamed input: {e}")
+            yield _sse_event("error", {"detail": "Internal server error"})
+
+    # A sync generator runs in the threadpool, so the blocking search and
+    # OpenAI calls don't stall the event loop
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,120 @@
+"""
+Compare flat chunk search with hierarchical (memory, then chunk) search.
+
+Usage:
+    python benchmark_search.py [--queries 100] [--k 10] [--widths 20,50,100]
+
+Stored chunk embeddings are used as queries, so no embeddings API calls are
+made. Recall@k is measured against an exact scan (index scans disabled);
+latency is the wall time of each ranking query.
+"""
+import argparse
+import logging
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Set
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import func, select, text
+
+from models import MemoryChunk
+from rag_service import RagMemoryService
+
+
+def _sample_query_embeddings(service: RagMemoryService, count: int) -> List[List[float]]:
+    """Pick random stored chunk embeddings to use as queries."""
+    with service._get_session_context() as session:
+        rows = session.execute(
+            select(MemoryChunk.embedding).order_by(func.random()).limit(count)
+        ).scalars().all()
+    return [list(embedding) for embedding in rows]
+
+
+def _timed_ids(service: RagMemoryService, search: Callable, exact: bool = False):
+    """Run one ranking query in its own transaction; return (memory ids, seconds)."""
+    session = service._get_session()
+    try:
+        if exact:
+            session.execute(text("SET LOCAL enable_indexscan = off"))
+        start = time.perf_counter()
+        scores = search(session)
+        elapsed = time.perf_counter() - start
+        session.rollback()
+        return [memory_id for memory_id, _ in scores], elapsed
+    finally:
+        session.close()
+
+
+def _summary(name: str, recalls: List[float], latencies: List[float]) -> Dict[str, Any]:
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    p95_index = max(0, int(round(0.95 * len(latencies_ms))) - 1)
+    return {
+        "name": name,
+        "recall": statistics.mean(recalls),
+        "p50_ms": statistics.median(latencies_ms),
+        "p95_ms": latencies_ms[p95_index],
+    }
+
+
+def run_benchmark(queries: int, k: int, widths: List[int]) -> List[Dict[str, Any]]:
+    """
+    Benchmark flat and hierarchical search on sampled queries.
+
+    Args:
+        queries: Number of sampled query embeddings
+        k: Memories per query
+        widths: Hierarchical first-stage widths to try
+
+    Returns:
+        One summary per strategy with mean recall@k and p50/p95 latency
+    """
+    service = RagMemoryService(auto_create_schema=False, load_graph=False)
+    embeddings = _sample_query_embeddings(service, queries)
+    if not embeddings:
+        raise RuntimeError("No chunk embeddings found to benchmark with")
+
+    truth: List[Set[int]] = []
+    for embedding in embeddings:
+        ids, _ = _timed_ids(
+            service,
+            lambda session: service._search_memory_scores(session, embedding, limit=k),
+            exact=True,
+        )
+        truth.append(set(ids))
+
+    strategies: Dict[str, Callable] = {
+        "flat": lambda session, embedding: service._search_memory_scores(session, embedding, limit=k),
+    }
+    for width in widths:
+        strategies[f"hierarchical(width={width})"] = (
+            lambda session, embedding, width=width: service._hierarchical_memory_scores(
+                session, embedding, limit=k, candidate_memories=width,
+            )
+        )
+
+    summaries = []
+    for name, search in strategies.items():
+        recalls, latencies = [], []
+        for embedding, expected in zip(embeddings, truth):
+            ids, elapsed = _timed_ids(service, lambda session: search(session, embedding))
+            recalls.append(len(expected & set(ids)) / len(expected) if expected else 1.0)
+            latencies.append(elapsed)
+        summaries.append(_summary(name, recalls, latencies))
+    return summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark flat vs hierarchical memory search")
+    parser.add_argument("--queries", type=int, default=100, help="Number of sampled queries")
+    parser.add_argument("--k", type=int, default=10, help="Memories per query")
+    parser.add_argument("--widths", type=str, default="20,50,100", help="Comma-separated first-stage widths")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = run_benchmark(args.queries, args.k, [int(w) for w in args.widths.split(",") if w.strip()])
+
+    print(f"{'strategy':<28}{'recall@' + str(args.k):>12}{'p50 ms':>10}{'p95 ms':>10}")
+    for row in results:
+        print(f"{row['name']:<28}{row['recall']:>12.3f}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}")
@@ -0,0 +1,189 @@
+"""
+Small thread-safe in-process caches used by the RAG memory service.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import threading
+import time
+
+import numpy as np
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with a fixed maximum size and
+    optional per-entry expiry.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: Optional[float] = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of entries (0 disables caching)
+            ttl: Seconds an entry stays valid after it is stored (None for no expiry)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        # key -> (value, monotonic expiry time or None)
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value for key (marking it recently used), or default."""
+        with self._lock:
+            try:
+                value, expires_at = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._data[key]
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full."""
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        """Remove a key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+class SemanticAnswerCache:
+    """
+    Thread-safe cache of answers keyed by question embedding.
+    
+    A lookup returns the stored entry whose question is most similar to the
+    new one, provided the similarity reaches the threshold and the entry was
+    stored under the same scope (e.g. category filter). Entries are evicted
+    oldest first once max_size is reached.
+    """
+
+    def __init__(self, max_size: int = 500, similarity_threshold: float = 0.95):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of entries (0 disables caching)
+            similarity_threshold: Minimum cosine similarity between questions for a hit
+        """
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        # Normalized question embeddings in a ring buffer; slot i holds _entries[i]
+        self._matrix: Optional[np.ndarray] = None
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * max(max_size, 0)
+        self._next_slot = 0
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.array(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def get(self, embedding: List[float], scope: Hashable = None) -> Optional[Dict[str, Any]]:
+        """
+        Find the closest cached question within the threshold.
+        
+        Args:
+            embedding: Embedding of the new question
+            scope: Only entries stored with an equal scope can match
+            
+        Returns:
+            The stored entry (with its "similarity" to the new question), or None
+        """
+        if self.max_size <= 0:
+            return None
+        query = self._normalize(embedding)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != query.shape[0]:
+                self._misses += 1
+                return None
+            similarities = self._matrix @ query
+            for slot, entry in enumerate(self._entries):
+                if entry is None or entry["scope"] != scope:
+                    similarities[slot] = -np.inf
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity_threshold:
+                self._misses += 1
+                return None
+            self._hits += 1
+            return dict(self._entries[best], similarity=float(similarities[best]))
+
+    def put(self, embedding: List[float], value: Dict[str, Any], scope: Hashable = None):
+        """Store an entry (a dict) for a question, evicting the oldest entry if full."""
+        if self.max_size <= 0:
+            return
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+                self._matrix = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+                self._entries = [None] * self.max_size
+                self._next_slot = 0
+            slot = self._next_slot
+            self._matrix[slot] = vector
+            self._entries[slot] = dict(value, scope=scope, entry_id=self._next_id, slot=slot)
+            self._next_slot = (slot + 1) % self.max_size
+            self._next_id += 1
+
+    def discard(self, entry: Dict[str, Any]):
+        """Remove an entry returned by get() (e.g. because its sources changed)."""
+        with self._lock:
+            slot = entry.get("slot")
+            current = self._entries[slot] if slot is not None and slot < len(self._entries) else None
+            # The slot may have been reused since the entry was returned
+            if current is not None and current["entry_id"] == entry.get("entry_id"):
+                self._entries[slot] = None
+                self._matrix[slot] = 0.0
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._matrix = None
+            self._entries = [None] * max(self.max_size, 0)
+            self._next_slot = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            return {
+                "size": sum(entry is not None for entry in self._entries),
+                "max_size": self.max_size,
+                "similarity_threshold": self.similarity_threshold,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
@@ -4,8 +4,8 @@ Automatically categorizes text content into predefined categories.
 """
 import logging
 from typing import Optional
-from anthropic import Anthropic
 from config import config
+from providers import get_anthropic_client
 
 logger = logging.getLogger(__name__)
 
@@ -57,7 +57,7 @@ class CategoryDetector:
         if not self.api_key:
             raise ValueError("Anthropic API key is required for category detection")
         
-        self.client = Anthropic(api_key=self.api_key)
+        self.client = get_anthropic_client(self.api_key)
         self.model = config.category_detection_model
 
     def detect_category(self, text: str) -> Optional[str]:
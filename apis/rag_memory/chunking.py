@@ -133,6 +133,21 @@ class TextChunker:
         
         return chunks_info
 
+    def get_chunk_span(self, chunk_index: int, chunk_text: str) -> Tuple[int, int]:
+        """
+        Word positions of a stored chunk, as get_chunk_info would report them,
+        without needing the full memory text.
+        
+        Args:
+            chunk_index: Position of the chunk within its memory (0-based)
+            chunk_text: The chunk's text
+            
+        Returns:
+            (start_word_idx, end_word_idx) tuple
+        """
+        start_idx = chunk_index * (self.chunk_size_words - self.overlap_words)
+        return start_idx, start_idx + len(self._tokenize_words(chunk_text))
+
     def estimate_num_chunks(self, text: str) -> int:
         """
         Estimate the number of chunks that will be created from text.
@@ -8,6 +8,9 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# Set by the AWS Lambda runtime (the Mangum handler in main.py)
+_ON_LAMBDA = bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
+
 
 @dataclass
 class RagConfig:
@@ -22,28 +25,114 @@ class RagConfig:
     # OpenAI settings
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     embedding_model: str = "text-embedding-3-small"
-    embedding_dimension: int = 1536
+    # Shortened text-embedding-3 vectors (e.g. 256/512) shrink the index; changing it
+    # requires re-embedding stored chunks with reembed.py
+    embedding_dimension: int = int(os.getenv("RAG_EMBEDDING_DIMENSION", "1536"))
     
     # Anthropic settings
     anthropic_api_key: str = os.getenv("ANTHROPIC_API_KEY", "")
     category_detection_model: str = "claude-3-5-haiku-20241022"
     
+    # Shared provider HTTP clients (see providers.py)
+    provider_http2: bool = os.getenv("RAG_PROVIDER_HTTP2", "true").lower() == "true"  # Needs the h2 package
+    provider_max_connections: int = 50  # Per provider client
+    provider_max_keepalive_connections: int = 20  # Idle connections kept open for reuse
+    provider_keepalive_expiry: float = 60.0  # Seconds an idle connection is kept
+    provider_warmup: bool = True  # Open provider connections at API startup
+    
     # Memory graph settings
     similarity_threshold: float = 0.7  # Minimum similarity to create edge (0.0 to 1.0)
     max_similar_connections: int = 5  # Max connections per memory
+    centroid_candidate_factor: int = 3  # Centroid-search candidates per connection when refining
+    centroid_refine: bool = True  # Re-score centroid candidates on their best chunk pair
     
     # Embedding cache settings
     cache_enabled: bool = True
     max_cache_size: int = 10000
     
+    # Memory read cache settings
+    memory_cache_size: int = 1000  # Max memories kept in the in-process LRU
+    # Writes from other processes are only seen once an entry expires (seconds, 0 = no expiry)
+    memory_cache_ttl: float = float(os.getenv("RAG_MEMORY_CACHE_TTL", "30"))
+    search_cache_size: int = 500  # Max cached search result lists
+    # Other processes' writes don't bump this process's write generation (seconds, 0 = no expiry)
+    search_cache_ttl: float = float(os.getenv("RAG_SEARCH_CACHE_TTL", "30"))
+    
     # Database connection pool settings
     pool_size: int = 10
     max_overflow: int = 20
     pool_recycle: int = 3600  # seconds
     
+    # Deployment: on Lambda the environment is frozen after each response,
+    # responses are buffered and requests are cut off by the gateway timeout
+    running_on_lambda: bool = _ON_LAMBDA
+    
+    # Statistics settings
+    stats_reconcile_interval: int = 300  # seconds between exact recounts of maintained counters
+    
+    # Background ingestion (POST /memories/jobs)
+    # Off by default on AWS Lambda: the execution environment is frozen between
+    # invocations, so worker threads and retry timers would not make progress
+    ingest_jobs_enabled: bool = os.getenv(
+        "RAG_INGEST_JOBS",
+        "false" if _ON_LAMBDA else "true",
+    ).lower() == "true"
+    ingest_workers: int = int(os.getenv("RAG_INGEST_WORKERS", "4"))  # Concurrent enrichment jobs
+    ingest_max_attempts: int = 3  # Attempts per job before it is marked failed
+    ingest_retry_backoff: float = 2.0  # Seconds before the first retry, doubled on each retry
+    ingest_lease_seconds: float = 600.0  # A running attempt older than this is considered abandoned
+    ingest_event_poll_interval: float = 1.0  # Max seconds between job checks in /jobs/{id}/events
+    
     # Search settings
     default_search_limit: int = 10
     max_search_limit: int = 100
+    max_batch_queries: int = 100  # Queries accepted by one batch search request
+    
+    # Vector index settings
+    vector_index_method: str = os.getenv("RAG_VECTOR_INDEX_METHOD", "hnsw")  # "hnsw" or "ivfflat"
+    vector_index_maintenance_work_mem: str = os.getenv("RAG_INDEX_MAINTENANCE_WORK_MEM", "")  # e.g. "1GB"
+    vector_storage: str = os.getenv("RAG_VECTOR_STORAGE", "full")  # "full", "halfvec" or "binary"
+    quantized_rerank_factor: int = 4  # Quantized-index candidates per reranked candidate
+    max_ef_search: int = 1000  # pgvector upper bound for hnsw.ef_search
+    search_candidate_factor: int = 3  # Initial chunk candidates per requested memory
+    search_max_candidates: int = 1000  # Upper bound when widening the candidate window
+    
+    # Hybrid (full-text + vector) search settings
+    default_search_mode: str = os.getenv("RAG_SEARCH_MODE", "vector")  # "vector", "hybrid", "hierarchical" or "graph"
+    text_search_config: str = "spanish"  # PostgreSQL text search configuration for memory.text
+    hybrid_rrf_k: int = 60  # Reciprocal rank fusion constant (higher flattens rank differences)
+    hierarchical_candidates: int = 50  # Memories kept by the centroid stage of hierarchical search
+    
+    # Answer context settings
+    matched_chunks_per_memory: int = 3  # Best-matching chunks returned per search result
+    answer_context_tokens: int = 1500  # Token budget for chunks packed into /process answers
+    
+    # Semantic answer cache for /process questions
+    answer_cache_size: int = 500  # Cached answers (0 disables the cache)
+    answer_cache_similarity: float = 0.95  # Question cosine similarity needed to reuse an answer
+    
+    # MMR diversification settings
+    mmr_pool_size: int = 20  # Candidates considered by the MMR rerank
+    answer_mmr_lambda: float = 0.7  # Relevance weight when picking /process answer context
+    
+    # Graph-augmented search settings (personalized PageRank around the vector hits)
+    graph_seed_count: int = 10  # Vector hits used as seeds
+    graph_max_hops: int = 2  # Expansion depth from the seeds
+    graph_max_nodes: int = 5000  # Cap on the expanded subgraph
+    graph_damping: float = 0.85  # Probability of following an edge vs. returning to a seed
+    graph_time_budget_ms: float = 50.0  # Wall-clock cap for expansion and iteration
+    
+    # /process intent routing (cues, then k-NN over logged decisions, then LLM)
+    intent_router_enabled: bool = os.getenv("RAG_INTENT_ROUTER", "true").lower() == "true"
+    intent_router_k: int = 7  # Neighbours consulted by the classifier
+    intent_router_min_examples: int = 20  # Logged decisions needed before the classifier is used
+    intent_router_confidence: float = 0.8  # Winning share of neighbour weight to decide locally
+    intent_router_max_examples: int = 5000  # Most recent logged decisions kept in memory
+    intent_router_audit_rate: float = 0.05  # Share of local decisions re-checked by the LLM
+    
+    # Category-filtered search settings
+    exact_search_max_chunks: int = 20000  # Categories up to this size are searched exactly
+    iterative_index_scan: bool = True  # Use pgvector >= 0.8 iterative scans for large categories
     
     # Chunking settings
     chunk_size_words: int = 200  # Number of words per chunk
@@ -66,8 +155,21 @@ class RagConfig:
         if self.max_similar_connections < 1:
             raise ValueError("max_similar_connections must be at least 1")
         
-        if self.embedding_dimension not in [1536, 3072]:
-            raise ValueError("embedding_dimension must be 1536 or 3072")
+        if self.vector_index_method not in ["hnsw", "ivfflat"]:
+            raise ValueError("vector_index_method must be 'hnsw' or 'ivfflat'")
+        
+        if self.vector_storage not in ["full", "halfvec", "binary"]:
+            raise ValueError("vector_storage must be 'full', 'halfvec' or 'binary'")
+        
+        if self.default_search_mode not in ["vector", "hybrid", "hierarchical", "graph"]:
+            raise ValueError("default_search_mode must be 'vector', 'hybrid', 'hierarchical' or 'graph'")
+        
+        if self.quantized_rerank_factor < 1:
+            raise ValueError("quantized_rerank_factor must be at least 1")
+        
+        max_dimension = 3072 if self.embedding_model == "text-embedding-3-large" else 1536
+        if not 1 <= self.embedding_dimension <= max_dimension:
+            raise ValueError(f"embedding_dimension must be between 1 and {max_dimension} for {self.embedding_model}")
 
 
 # Global config instance
@@ -2,7 +2,9 @@ import os
 import hashlib
 import logging
 from typing import List, Dict, Optional
-from openai import OpenAI, OpenAIError
+from openai import OpenAIError
+
+from providers import get_openai_client
 
 logger = logging.getLogger(__name__)
 
@@ -11,14 +13,15 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise RuntimeError("OPENAI_API_KEY environment variable is not set.")
 
-client = OpenAI(api_key=OPENAI_API_KEY)
-
 
 class EmbeddingGenerator:
     """
     Wrapper around OpenAI embeddings API.
     Uses text-embedding-3-small by default.
     Includes caching to avoid redundant API calls.
+    
+    text-embedding-3 models can return shortened embeddings through the
+    `dimensions` parameter (e.g. 256 or 512) for a smaller, faster index.
     """
 
     def __init__(
@@ -26,15 +29,22 @@ class EmbeddingGenerator:
         model_name: str = "text-embedding-3-small",
         cache_enabled: bool = True,
         max_cache_size: int = 10000,
+        dimensions: Optional[int] = None,
     ):
         self.model_name = model_name
         self.cache_enabled = cache_enabled
         self.max_cache_size = max_cache_size
+        self.dimensions = dimensions
         self._cache: Dict[str, List[float]] = {}
 
     def _get_cache_key(self, text: str) -> str:
-        """Generate a cache key for the given text."""
-        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+        """Generate a cache key for the given text, model and dimensions."""
+        key = f"{self.model_name}:{self.dimensions or 'native'}:{text}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _request_options(self) -> Dict[str, int]:
+        """Extra embeddings.create arguments (only send dimensions when shortening)."""
+        return {"dimensions": self.dimensions} if self.dimensions else {}
 
     def generate_embedding(self, text: str) -> List[float]:
         """
@@ -65,9 +75,10 @@ class EmbeddingGenerator:
                 return self._cache[cache_key]
         
         try:
-            response = client.embeddings.create(
+            response = get_openai_client(OPENAI_API_KEY).embeddings.create(
                 model=self.model_name,
                 input=text,
+                **self._request_options(),
             )
             embedding = response.data[0].embedding
             
@@ -134,9 +145,10 @@ class EmbeddingGenerator:
         
         try:
             # Batch API call for uncached texts
-            response = client.embeddings.create(
+            response = get_openai_client(OPENAI_API_KEY).embeddings.create(
                 model=self.model_name,
                 input=uncached_texts,
+                **self._request_options(),
             )
             
             # Process results
@@ -1,6 +1,11 @@
-from typing import List, Tuple, Optional, Set
+from typing import List, Tuple, Optional, Set, Dict, Iterable
+from operator import itemgetter
+import heapq
 import logging
+import threading
+import time
 import networkx as nx
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
@@ -15,11 +20,50 @@ class MemoryGraphStore:
     
     This class maintains an in-memory NetworkX graph for fast traversal
     while keeping it synchronized with the database for persistence.
+    
+    Request handlers read the graph while ingest workers modify it, so every
+    mutation and multi-step read holds `lock`. Callers making several changes
+    that should appear at once (e.g. replacing a memory's edges) can hold it too.
     """
 
     def __init__(self):
         self.graph = nx.Graph()
+        self.lock = threading.RLock()
         self._is_loaded = False
+        
+        # Incrementally maintained statistics so get_graph_stats() is O(1).
+        # Components are tracked with a union-find that handles additions;
+        # node removals mark it dirty and it is rebuilt lazily.
+        self._edge_count = 0
+        self._component_parent: Dict[int, int] = {}
+        self._component_count = 0
+        self._components_dirty = False
+
+    def _find_component(self, node: int) -> int:
+        """Find the union-find root of a node (with path halving)."""
+        parent = self._component_parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def _track_node(self, node: int):
+        """Register a node in the union-find if not already tracked."""
+        if node not in self._component_parent:
+            self._component_parent[node] = node
+            self._component_count += 1
+
+    def _reset_stats(self):
+        """Recompute all incremental statistics from the current graph."""
+        self._edge_count = self.graph.number_of_edges()
+        self._component_parent = {}
+        self._component_count = 0
+        for component in nx.connected_components(self.graph):
+            root = next(iter(component))
+            for node in component:
+                self._component_parent[node] = root
+            self._component_count += 1
+        self._components_dirty = False
 
     def load_from_database(self, session: Session):
         """
@@ -30,39 +74,58 @@ class MemoryGraphStore:
         
         logger.info("Loading graph from database...")
         
-        # Load all memory nodes
+        # Build the new graph without the lock, then swap it in
+        graph = nx.Graph()
         memory_ids = session.execute(select(Memory.id)).scalars().all()
-        for memory_id in memory_ids:
-            self.graph.add_node(memory_id)
+        graph.add_nodes_from(memory_ids)
         
-        # Load all edges
         edges = session.execute(
             select(MemoryEdge.source_id, MemoryEdge.target_id, MemoryEdge.weight)
         ).all()
+        graph.add_weighted_edges_from(edges)
         
-        for source_id, target_id, weight in edges:
-            self.graph.add_edge(source_id, target_id, weight=weight)
-        
-        self._is_loaded = True
-        logger.info(f"Graph loaded: {self.graph.number_of_nodes()} nodes, {self.graph.number_of_edges()} edges")
+        with self.lock:
+            self.graph = graph
+            self._reset_stats()
+            self._is_loaded = True
+        logger.info(f"Graph loaded: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
 
     def add_memory_node(self, memory_id: int):
         """Add a memory node to the graph."""
-        self.graph.add_node(memory_id)
+        with self.lock:
+            self.graph.add_node(memory_id)
+            if not self._components_dirty:
+                self._track_node(memory_id)
         logger.debug(f"Added node: {memory_id}")
 
     def add_similarity_edge(self, memory_a_id: int, memory_b_id: int, score: float):
         """
         Add a bidirectional similarity edge between two memories.
         """
-        self.graph.add_edge(memory_a_id, memory_b_id, weight=score)
+        with self.lock:
+            if not self.graph.has_edge(memory_a_id, memory_b_id):
+                self._edge_count += 1
+                if not self._components_dirty:
+                    self._track_node(memory_a_id)
+                    self._track_node(memory_b_id)
+                    root_a = self._find_component(memory_a_id)
+                    root_b = self._find_component(memory_b_id)
+                    if root_a != root_b:
+                        self._component_parent[root_a] = root_b
+                        self._component_count -= 1
+            self.graph.add_edge(memory_a_id, memory_b_id, weight=score)
         logger.debug(f"Added edge: {memory_a_id} <-> {memory_b_id} (weight={score:.3f})")
 
     def remove_memory_node(self, memory_id: int):
         """Remove a memory node and all its edges from the graph."""
-        if memory_id in self.graph:
+        with self.lock:
+            if memory_id not in self.graph:
+                return
+            self._edge_count -= self.graph.degree(memory_id)
             self.graph.remove_node(memory_id)
-            logger.debug(f"Removed node: {memory_id}")
+            # Removing a node may split a component; rebuild lazily
+            self._components_dirty = True
+        logger.debug(f"Removed node: {memory_id}")
 
     def get_neighbors(self, memory_id: int, limit: int = 5) -> List[Tuple[int, float]]:
         """
@@ -75,11 +138,12 @@ class MemoryGraphStore:
         Returns:
             List of (neighbor_id, similarity_score) tuples, sorted by score descending
         """
-        if memory_id not in self.graph:
-            logger.warning(f"Memory {memory_id} not found in graph")
-            return []
+        with self.lock:
+            if memory_id not in self.graph:
+                logger.warning(f"Memory {memory_id} not found in graph")
+                return []
+            neighbors = list(self.graph[memory_id].items())
 
-        neighbors = self.graph[memory_id].items()
         sorted_neighbors = sorted(
             neighbors,
             key=lambda item: item[1].get("weight", 0.0),
@@ -91,20 +155,139 @@ class MemoryGraphStore:
             for neighbor_id, data in sorted_neighbors[:limit]
         ]
 
+    def get_neighbors_batch(
+        self,
+        memory_ids: Iterable[int],
+        limit: int = 5,
+    ) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        Get the top N most similar neighbors for several memories at once.
+        
+        Args:
+            memory_ids: The memories to find neighbors for
+            limit: Maximum number of neighbors per memory
+            
+        Returns:
+            Dictionary mapping memory_id to a list of (neighbor_id, similarity_score)
+            tuples sorted by score descending. Memories not in the graph map to [].
+        """
+        by_score = itemgetter(1)
+        result: Dict[int, List[Tuple[int, float]]] = {}
+        with self.lock:
+            adjacency = self.graph.adj
+            for memory_id in memory_ids:
+                neighbors = adjacency.get(memory_id)
+                if not neighbors:
+                    result[memory_id] = []
+                    continue
+                scored = [(neighbor_id, data.get("weight", 0.0)) for neighbor_id, data in neighbors.items()]
+                result[memory_id] = heapq.nlargest(limit, scored, key=by_score)
+        return result
+
+    def personalized_pagerank(
+        self,
+        seeds: Dict[int, float],
+        max_hops: int = 2,
+        damping: float = 0.85,
+        max_nodes: int = 5000,
+        max_iterations: int = 50,
+        tolerance: float = 1e-6,
+        time_budget_ms: Optional[float] = None,
+    ) -> Dict[int, float]:
+        """
+        Rank memories around a set of seeds by personalized PageRank.
+        
+        The walk is restricted to the subgraph within max_hops of the seeds
+        (at most max_nodes nodes), stored as COO arrays; each iteration is a
+        weighted sparse mat-vec done with np.bincount. Iteration stops on
+        convergence, after max_iterations, or when the time budget runs out
+        (returning the current, partially converged scores).
+        
+        Args:
+            seeds: Mapping of seed memory_id to its personalization weight (e.g. vector similarity)
+            max_hops: How far from the seeds the walk may go
+            damping: Probability of following an edge instead of jumping back to a seed
+            max_nodes: Cap on the size of the expanded subgraph
+            max_iterations: Maximum power iterations
+            tolerance: L1 change below which the scores are considered converged
+            time_budget_ms: Optional wall-clock budget for expansion and iteration
+            
+        Returns:
+            Dictionary mapping memory_id to its PageRank score (scores sum to 1)
+        """
+        started = time.perf_counter()
+        deadline = started + time_budget_ms / 1000.0 if time_budget_ms else None
+        
+        seeds = {node: weight for node, weight in seeds.items() if weight > 0}
+        if not seeds:
+            return {}
+        
+        # The subgraph is extracted under the lock; the iterations run on its arrays
+        with self.lock:
+            adjacency = self.graph.adj
+            
+            # Bounded breadth-first expansion from the seeds
+            index: Dict[int, int] = {node: i for i, node in enumerate(seeds)}
+            frontier = list(seeds)
+            for _ in range(max_hops):
+                next_frontier = []
+                for node in frontier:
+                    for neighbor in adjacency.get(node, ()):
+                        if neighbor not in index and len(index) < max_nodes:
+                            index[neighbor] = len(index)
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+                if not frontier or (deadline and time.perf_counter() > deadline):
+                    break
+            
+            nodes = list(index)
+            size = len(nodes)
+            sources, targets, weights = [], [], []
+            for node in nodes:
+                source = index[node]
+                for neighbor, data in adjacency.get(node, {}).items():
+                    target = index.get(neighbor)
+                    if target is not None:
+                        sources.append(source)
+                        targets.append(target)
+                        weights.append(data.get("weight", 0.0))
+        
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        
+        # Row-normalize so each node spreads its score over its edges by weight
+        out_weight = np.bincount(sources, weights=weights, minlength=size)
+        transition = weights / np.where(out_weight[sources] > 0, out_weight[sources], 1.0)
+        dangling = out_weight == 0
+        
+        personalization = np.zeros(size)
+        for node, weight in seeds.items():
+            personalization[index[node]] = weight
+        personalization /= personalization.sum()
+        
+        scores = personalization.copy()
+        for _ in range(max_iterations):
+            spread = np.bincount(targets, weights=transition * scores[sources], minlength=size)
+            # Mass on nodes without edges (inside the subgraph) returns to the seeds
+            spread += scores[dangling].sum() * personalization
+            updated = damping * spread + (1.0 - damping) * personalization
+            change = np.abs(updated - scores).sum()
+            scores = updated
+            if change < tolerance or (deadline and time.perf_counter() > deadline):
+                break
+        
+        return {node: float(scores[i]) for i, node in enumerate(nodes)}
+
     def get_connected_component(self, memory_id: int) -> Set[int]:
         """
         Get all memories in the same connected component as the given memory.
         Useful for finding clusters of related memories.
         """
-        if memory_id not in self.graph:
-            return set()
-        
-        # Find the connected component containing this node
-        for component in nx.connected_components(self.graph):
-            if memory_id in component:
-                return component
-        
-        return {memory_id}
+        with self.lock:
+            if memory_id not in self.graph:
+                return set()
+            return set(nx.node_connected_component(self.graph, memory_id))
 
     def get_shortest_path(
         self,
@@ -115,36 +298,49 @@ class MemoryGraphStore:
         Find the shortest path between two memories in the similarity graph.
         Returns None if no path exists.
         """
-        if source_id not in self.graph or target_id not in self.graph:
-            return None
-        
-        try:
-            path = nx.shortest_path(self.graph, source_id, target_id)
-            return path
-        except nx.NetworkXNoPath:
-            return None
+        with self.lock:
+            if source_id not in self.graph or target_id not in self.graph:
+                return None
+            
+            try:
+                return nx.shortest_path(self.graph, source_id, target_id)
+            except nx.NetworkXNoPath:
+                return None
 
     def get_graph_stats(self) -> dict:
-        """Get statistics about the graph."""
-        if not self.graph.number_of_nodes():
-            return {
-                "nodes": 0,
-                "edges": 0,
-                "connected_components": 0,
-                "average_degree": 0.0,
-                "density": 0.0,
-            }
-        
+        """
+        Get statistics about the graph.
+        O(1) from incrementally maintained counters, except for the first call
+        after a node removal, which rebuilds the component index.
+        """
+        with self.lock:
+            num_nodes = self.graph.number_of_nodes()
+            if not num_nodes:
+                return {
+                    "nodes": 0,
+                    "edges": 0,
+                    "connected_components": 0,
+                    "average_degree": 0.0,
+                    "density": 0.0,
+                }
+            
+            if self._components_dirty:
+                self._reset_stats()
+            
+            num_edges = self._edge_count
+            component_count = self._component_count
         return {
-            "nodes": self.graph.number_of_nodes(),
-            "edges": self.graph.number_of_edges(),
-            "connected_components": nx.number_connected_components(self.graph),
-            "average_degree": sum(dict(self.graph.degree()).values()) / self.graph.number_of_nodes(),
-            "density": nx.density(self.graph),
+            "nodes": num_nodes,
+            "edges": num_edges,
+            "connected_components": component_count,
+            "average_degree": 2 * num_edges / num_nodes,
+            "density": 2 * num_edges / (num_nodes * (num_nodes - 1)) if num_nodes > 1 else 0.0,
         }
 
     def clear(self):
         """Clear the entire graph."""
-        self.graph.clear()
-        self._is_loaded = False
+        with self.lock:
+            self.graph.clear()
+            self._reset_stats()
+            self._is_loaded = False
         logger.info("Graph cleared")
@@ -0,0 +1,240 @@
+"""
+Background worker pool for deferred memory ingestion.
+
+POST /memories/jobs stores the raw memory and an ingest_job row in one INSERT
+(RagMemoryService.add_memory_deferred). The pool then runs the enrichment
+stages (RagMemoryService.enrich_memory) with retries and exponential backoff,
+recording progress on the job row so any API process can report it.
+
+The pool runs on threads of a long-lived API process. It is disabled on AWS
+Lambda (config.ingest_jobs_enabled), where the environment is frozen between
+invocations and queued work would stall.
+
+Jobs are claimed with a conditional UPDATE, so only one process runs a given
+attempt. A running job whose lease (started_at + lease_seconds) has expired is
+assumed abandoned by a stopped process and can be claimed again.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+import logging
+import threading
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import IngestJob
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+class IngestWorkerPool:
+    """
+    Runs memory enrichment jobs on a thread pool.
+    """
+
+    def __init__(
+        self,
+        rag_service: Any,
+        session_factory: Callable,
+        workers: int = 4,
+        max_attempts: int = 3,
+        retry_backoff: float = 2.0,
+        lease_seconds: float = 600.0,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            rag_service: RagMemoryService that performs the enrichment
+            session_factory: Callable returning a new database session
+            workers: Concurrent enrichment jobs
+            max_attempts: Attempts per job before it is marked failed
+            retry_backoff: Seconds before the first retry (doubled on each one)
+            lease_seconds: How long a running attempt owns its job before others may take it over
+        """
+        self.rag_service = rag_service
+        self.session_factory = session_factory
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease = timedelta(seconds=lease_seconds)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        # Notified whenever a job changes, so status streams don't have to poll
+        self._changed = threading.Condition()
+        self._retry_timers: Dict[int, threading.Timer] = {}
+        self._closed = False
+
+    def submit(self, job_id: int):
+        """Queue a job for enrichment."""
+        if not self._closed:
+            self._executor.submit(self._run, job_id)
+
+    def _claimable(self):
+        """Condition for jobs an attempt may start on: pending, or running with an expired lease."""
+        return or_(
+            IngestJob.status == "pending",
+            and_(IngestJob.status == "running", IngestJob.started_at < func.now() - self.lease),
+        )
+
+    def resume_pending(self) -> int:
+        """
+        Queue jobs nobody is working on: pending ones (e.g. waiting for a retry
+        when their process stopped) and running ones whose lease has expired.
+        Jobs running elsewhere are left alone; claiming is atomic either way.
+
+        Returns:
+            Number of jobs queued
+        """
+        session = self.session_factory()
+        try:
+            job_ids = session.execute(
+                select(IngestJob.id)
+                .where(self._claimable())
+                .order_by(IngestJob.id)
+            ).scalars().all()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error loading pending ingest jobs: {e}")
+            raise
+        finally:
+            session.close()
+
+        for job_id in job_ids:
+            self.submit(job_id)
+        if job_ids:
+            logger.info(f"Resumed {len(job_ids)} pending ingest jobs")
+        return len(job_ids)
+
+    def get_job(self, job_id: int) -> Optional[IngestJob]:
+        """Load a job (detached), or None if it doesn't exist."""
+        session = self.session_factory()
+        try:
+            job = session.get(IngestJob, job_id)
+            if job is not None:
+                session.expunge(job)
+            return job
+        except SQLAlchemyError as e:
+            logger.error(f"Database error retrieving ingest job {job_id}: {e}")
+            raise
+        finally:
+            session.close()
+
+    def wait_for_change(self, timeout: float):
+        """Block until a job handled by this process changes, or timeout seconds pass."""
+        with self._changed:
+            self._changed.wait(timeout)
+
+    def _claim(self, job_id: int) -> Optional[Any]:
+        """
+        Atomically start an attempt on a job.
+
+        Returns:
+            Row with memory_id, auto_categorize and attempts (this attempt's
+            number), or None if the job is finished or owned by another attempt
+        """
+        session = self.session_factory()
+        try:
+            row = session.execute(
+                update(IngestJob)
+                .where(IngestJob.id == job_id, self._claimable())
+                .values(status="running", attempts=IngestJob.attempts + 1, started_at=func.now())
+                .returning(IngestJob.memory_id, IngestJob.auto_categorize, IngestJob.attempts)
+            ).first()
+            session.commit()
+        finally:
+            session.close()
+        if row is not None:
+            with self._changed:
+                self._changed.notify_all()
+        return row
+
+    def _update_job(self, job_id: int, attempt: int, **values) -> bool:
+        """
+        Write job fields for an attempt and wake up status streams. Ignored if
+        the attempt no longer owns the job (its lease expired and another
+        attempt claimed it).
+
+        Returns:
+            Whether the job was updated
+        """
+        session = self.session_factory()
+        try:
+            updated = session.execute(
+                update(IngestJob)
+                .where(IngestJob.id == job_id, IngestJob.status == "running", IngestJob.attempts == attempt)
+                .values(**values)
+            ).rowcount
+            session.commit()
+        finally:
+            session.close()
+        if not updated:
+            logger.warning(f"Ingest job {job_id} attempt {attempt} lost its claim")
+        with self._changed:
+            self._changed.notify_all()
+        return bool(updated)
+
+    def _run(self, job_id: int):
+        """Run one attempt of a job, scheduling a retry if it fails."""
+        self._retry_timers.pop(job_id, None)
+        try:
+            job = self._claim(job_id)
+        except SQLAlchemyError as e:
+            logger.error(f"Could not start ingest job {job_id}: {e}")
+            return
+        if job is None:
+            return
+        attempt = job.attempts
+
+        try:
+            memory = None
+            if job.memory_id is not None:
+                memory = self.rag_service.enrich_memory(job.memory_id, auto_categorize=job.auto_categorize)
+        except Exception as e:
+            self._attempt_failed(job_id, attempt, e)
+            return
+
+        try:
+            if memory is None:
+                self._update_job(
+                    job_id,
+                    attempt,
+                    status="failed",
+                    error="Memory was deleted before enrichment",
+                    finished_at=datetime.now(timezone.utc),
+                )
+            else:
+                self._update_job(job_id, attempt, status="succeeded", error=None, finished_at=datetime.now(timezone.utc))
+                logger.info(f"Ingest job {job_id} succeeded (attempt {attempt})")
+        except SQLAlchemyError as e:
+            # Enrichment is committed; a rerun after restart would only redo it
+            logger.error(f"Could not record completion of ingest job {job_id}: {e}")
+
+    def _attempt_failed(self, job_id: int, attempt: int, error: Exception):
+        """Record a failed attempt and retry with exponential backoff, or give up."""
+        logger.warning(f"Ingest job {job_id} attempt {attempt} failed: {error}")
+        try:
+            if attempt >= self.max_attempts:
+                self._update_job(job_id, attempt, status="failed", error=str(error), finished_at=datetime.now(timezone.utc))
+                logger.error(f"Ingest job {job_id} failed after {attempt} attempts")
+                return
+            if not self._update_job(job_id, attempt, status="pending", error=str(error)):
+                return
+        except SQLAlchemyError as e:
+            logger.error(f"Could not record failure of ingest job {job_id}: {e}")
+            return
+
+        if self._closed:
+            return
+        # Waiting on a timer keeps the worker free for other jobs
+        timer = threading.Timer(self.retry_backoff * 2 ** (attempt - 1), self.submit, args=(job_id,))
+        timer.daemon = True
+        self._retry_timers[job_id] = timer
+        timer.start()
+
+    def shutdown(self):
+        """Stop accepting jobs and wait for running ones (pending retries resume on restart)."""
+        self._closed = True
+        for timer in list(self._retry_timers.values()):
+            timer.cancel()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,319 @@
+"""
+Local save-vs-ask routing for /process.
+
+Requests are routed in stages, cheapest first:
+1. Cues: short inputs ending in a question mark or opening with an interrogative,
+   or "remember that"-style phrasing.
+2. Classifier: weighted k-nearest-neighbours vote over embeddings of past,
+   trusted decisions (LLM tool calls and explicit user overrides).
+3. LLM: the tool-calling decider, used only when the earlier stages are unsure.
+   Its decisions are stored and become training examples for stage 2.
+
+A small fraction of local decisions is re-checked by the LLM in the background
+to measure routing accuracy.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import logging
+import random
+import re
+import threading
+import time
+import unicodedata
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import IntentDecision
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ("save", "ask")
+LOCAL_DECIDERS = ("cues", "classifier")
+
+# Matched against lowercased, accent-stripped text; kept high precision, the
+# classifier handles everything else. Question marks only count at the ends:
+# a note may quote a question mid-text
+_ASK_PATTERN = re.compile(
+    r"^¿|\?$"
+    r"|^(cual|cuales|cuando|donde|quien|quienes|cuanto|cuanta|cuantos|cuantas|por que"
+    r"|what|which|when|where|who|why|how)\b"
+    r"|^(dime|busca|muestrame|sabes|tell me|show me|do you know|find)\b"
+)
+_SAVE_PATTERN = re.compile(
+    r"^(?:(recuerda que|guarda|anota|apunta|memoriza|remember that|save|note that)\b|nota:|note:)"
+)
+# Longer inputs are dictated notes more often than questions, so ask cues are
+# only trusted below this length
+_ASK_CUE_MAX_WORDS = 30
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and strip accents so cues match however the text was typed or transcribed."""
+    decomposed = unicodedata.normalize("NFKD", text.strip().lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+class IntentRouter:
+    """
+    Decides 'save' vs 'ask' locally when confident, escalating to an LLM otherwise.
+    """
+
+    def __init__(
+        self,
+        embedding_generator: Any,
+        llm_decider: Callable[[str], Optional[str]],
+        session_factory: Callable,
+        k: int = 7,
+        min_examples: int = 20,
+        confidence_threshold: float = 0.8,
+        max_examples: int = 5000,
+        audit_rate: float = 0.05,
+        load_examples: bool = True,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            embedding_generator: EmbeddingGenerator used to embed incoming text
+            llm_decider: Fallback decider returning 'save', 'ask' or None if it failed
+            session_factory: Callable returning a new database session
+            k: Neighbours consulted by the classifier
+            min_examples: Labelled examples required before the classifier is used
+            confidence_threshold: Share of neighbour weight the winning intent needs
+            max_examples: Most recent labelled examples kept in memory
+            audit_rate: Fraction of local decisions re-checked by the LLM
+            load_examples: Whether to load stored decisions now
+        """
+        self.embedding_generator = embedding_generator
+        self.llm_decider = llm_decider
+        self.session_factory = session_factory
+        self.k = k
+        self.min_examples = min_examples
+        self.confidence_threshold = confidence_threshold
+        self.max_examples = max_examples
+        self.audit_rate = audit_rate
+
+        # Normalized example embeddings (one row each) and their intents
+        self._lock = threading.Lock()
+        self._embeddings: Optional[np.ndarray] = None
+        self._labels: List[str] = []
+
+        # Labels are stored and audits run off the request path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="intent-router")
+
+        self._decisions: Dict[str, int] = {"cues": 0, "classifier": 0, "tool_calling": 0}
+        self._latencies: Dict[str, Deque[float]] = {
+            decider: deque(maxlen=1000) for decider in self._decisions
+        }
+        self._audits: Dict[str, Dict[str, int]] = {
+            decider: {"audited": 0, "correct": 0} for decider in LOCAL_DECIDERS
+        }
+
+        if load_examples:
+            self.load_examples()
+
+    def load_examples(self):
+        """Load the most recent labelled decisions, embedding any stored without one."""
+        session = self.session_factory()
+        try:
+            rows = session.execute(
+                select(IntentDecision.id, IntentDecision.text, IntentDecision.intent, IntentDecision.embedding)
+                .order_by(IntentDecision.id.desc())
+                .limit(self.max_examples)
+            ).all()
+
+            # Embeddings are cleared when the embedding dimension changes (reembed.py)
+            missing = [row for row in rows if row.embedding is None]
+            embedded = {}
+            if missing:
+                vectors = self.embedding_generator.generate_embeddings_batch([row.text for row in missing])
+                for row, vector in zip(missing, vectors):
+                    embedded[row.id] = vector
+                    session.execute(
+                        update(IntentDecision).where(IntentDecision.id == row.id).values(embedding=vector)
+                    )
+                session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"Database error loading intent decisions: {e}")
+            raise
+        finally:
+            session.close()
+
+        # Oldest first, so appends keep the matrix in insertion order
+        examples = [
+            (embedded.get(row.id, row.embedding), row.intent)
+            for row in reversed(rows)
+        ]
+        with self._lock:
+            if examples:
+                self._embeddings = self._normalize_rows(np.asarray([e for e, _ in examples], dtype=np.float32))
+                self._labels = [label for _, label in examples]
+            else:
+                self._embeddings = None
+                self._labels = []
+        logger.info(f"Loaded {len(examples)} intent routing examples")
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+    @staticmethod
+    def cue_intent(text: str) -> Optional[str]:
+        """Intent implied by surface cues, or None if there are none or they conflict."""
+        normalized = _normalize(text)
+        is_ask = len(normalized.split()) <= _ASK_CUE_MAX_WORDS and bool(_ASK_PATTERN.search(normalized))
+        is_save = bool(_SAVE_PATTERN.search(normalized))
+        if is_ask == is_save:
+            return None
+        return "ask" if is_ask else "save"
+
+    def classify(self, embedding: List[float]) -> Tuple[Optional[str], float]:
+        """
+        Weighted k-NN vote over the labelled examples.
+
+        Args:
+            embedding: Embedding of the incoming text
+
+        Returns:
+            (intent, confidence) where confidence is the winning share of
+            neighbour similarity; (None, 0.0) until min_examples are available
+        """
+        with self._lock:
+            matrix, labels = self._embeddings, self._labels
+        if matrix is None or len(labels) < self.min_examples:
+            return None, 0.0
+
+        query = np.array(embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        similarities = matrix @ query
+
+        k = min(self.k, len(labels))
+        neighbours = np.argpartition(-similarities, k - 1)[:k]
+        votes = {intent: 0.0 for intent in INTENTS}
+        for index in neighbours:
+            votes[labels[index]] += max(float(similarities[index]), 0.0)
+
+        intent = max(votes, key=votes.get)
+        total = sum(votes.values())
+        return intent, (votes[intent] / total if total > 0 else 0.0)
+
+    def decide(self, text: str) -> Tuple[str, str]:
+        """
+        Route one request.
+
+        Args:
+            text: User input
+
+        Returns:
+            (intent, decider) where decider is 'cues', 'classifier' or 'tool_calling'
+        """
+        start = time.perf_counter()
+        intent = self.cue_intent(text)
+        if intent is not None:
+            return self._finish(text, intent, "cues", start)
+
+        embedding = None
+        try:
+            embedding = self.embedding_generator.generate_embedding(text)
+            intent, confidence = self.classify(embedding)
+            if intent is not None and confidence >= self.confidence_threshold:
+                return self._finish(text, intent, "classifier", start)
+        except Exception as e:
+            logger.warning(f"Intent classifier failed, escalating: {e}")
+
+        intent = self.llm_decider(text)
+        if intent is None:
+            # Saving is the safe default: nothing the user said gets lost
+            return self._finish(text, "save", "tool_calling", start)
+        self._executor.submit(self._store_label, text, intent, "tool_calling", embedding)
+        return self._finish(text, intent, "tool_calling", start)
+
+    def _finish(self, text: str, intent: str, decider: str, start: float) -> Tuple[str, str]:
+        """Record metrics for a decision (and maybe schedule an audit)."""
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._decisions[decider] += 1
+            self._latencies[decider].append(elapsed)
+        if decider in LOCAL_DECIDERS and random.random() < self.audit_rate:
+            self._executor.submit(self._audit, text, intent, decider)
+        return intent, decider
+
+    def record(self, text: str, intent: str, decider: str = "override"):
+        """
+        Store a trusted decision made outside the router (e.g. a user override)
+        as a training example, in the background.
+        """
+        if intent in INTENTS:
+            self._executor.submit(self._store_label, text, intent, decider, None)
+
+    def _audit(self, text: str, intent: str, decider: str):
+        """Compare a local decision with the LLM's; the LLM label also becomes an example."""
+        expected = self.llm_decider(text)
+        if expected is None:
+            return
+        with self._lock:
+            self._audits[decider]["audited"] += 1
+            self._audits[decider]["correct"] += int(expected == intent)
+        self._store_label(text, expected, "audit", None)
+
+    def _store_label(self, text: str, intent: str, decider: str, embedding: Optional[List[float]]):
+        """Persist a labelled example and add it to the classifier."""
+        try:
+            if embedding is None:
+                embedding = self.embedding_generator.generate_embedding(text)
+            session = self.session_factory()
+            try:
+                session.add(IntentDecision(text=text, intent=intent, decider=decider, embedding=embedding))
+                session.commit()
+            finally:
+                session.close()
+        except Exception as e:
+            logger.error(f"Failed to store intent decision: {e}")
+            return
+
+        row = self._normalize_rows(np.asarray([embedding], dtype=np.float32))
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = row
+            else:
+                self._embeddings = np.vstack([self._embeddings, row])[-self.max_examples:]
+            self._labels = (self._labels + [intent])[-self.max_examples:]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Routing statistics.
+
+        Returns:
+            Dictionary with example count, decisions per stage, share handled
+            locally, p50/p95 latency per stage (ms) and audited accuracy of the
+            local stages
+        """
+        with self._lock:
+            decisions = dict(self._decisions)
+            latencies = {decider: sorted(values) for decider, values in self._latencies.items()}
+            audits = {decider: dict(counts) for decider, counts in self._audits.items()}
+            examples = len(self._labels)
+
+        total = sum(decisions.values())
+        latency_ms = {}
+        for decider, values in latencies.items():
+            if values:
+                latency_ms[decider] = {
+                    "p50": values[len(values) // 2] * 1000,
+                    "p95": values[max(0, int(round(0.95 * len(values))) - 1)] * 1000,
+                }
+        for counts in audits.values():
+            counts["accuracy"] = counts["correct"] / counts["audited"] if counts["audited"] else None
+
+        return {
+            "examples": examples,
+            "decisions": decisions,
+            "local_rate": (decisions["cues"] + decisions["classifier"]) / total if total else None,
+            "latency_ms": latency_ms,
+            "accuracy": audits,
+        }
@@ -1,7 +1,22 @@
-from sqlalchemy import Column, Integer, Text, DateTime, Float, ForeignKey, String, Index
+from sqlalchemy import Column, Integer, Text, DateTime, Float, ForeignKey, String, Index, Boolean, literal_column
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from pgvector.sqlalchemy import Vector
 from database import Base
+from config import config
+
+
+def text_search_regconfig():
+    """Text search configuration (e.g. 'spanish') as a regconfig literal."""
+    return literal_column(f"'{config.text_search_config}'::regconfig")
+
+
+def memory_text_search_vector(text_column):
+    """
+    tsvector expression over memory text. Queries must use this exact
+    expression for PostgreSQL to match it to idx_memory_text_fts.
+    """
+    return func.to_tsvector(text_search_regconfig(), text_column)
 
 
 class Memory(Base):
@@ -18,10 +33,21 @@ class Memory(Base):
     category = Column(String(100), nullable=True, index=True)
     source = Column(String(255), nullable=True)
     
+    # Mean of the memory's normalized chunk embeddings, used to find edge candidates
+    # with one ANN query; deferred so regular memory loads don't fetch it
+    centroid_embedding = deferred(Column(Vector(config.embedding_dimension), nullable=True))
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Composite index backing keyset pagination on (created_at, id), and
+    # full-text index for the lexical side of hybrid search
+    __table_args__ = (
+        Index('idx_memory_created_at_id', created_at.desc(), id.desc()),
+        Index('idx_memory_text_fts', memory_text_search_vector(text), postgresql_using='gin'),
+    )
+    
     def __repr__(self):
         text_preview = self.text[:50] + "..." if len(self.text) > 50 else self.text
         return f"<Memory(id={self.id}, text='{text_preview}')>"
@@ -43,7 +69,7 @@ class MemoryChunk(Base):
     )
     chunk_text = Column(Text, nullable=False)
     chunk_index = Column(Integer, nullable=False)  # Order within memory (0-based)
-    embedding = Column(Vector(1536))  # text-embedding-3-small dimension
+    embedding = Column(Vector(config.embedding_dimension))  # text-embedding-3 (optionally shortened)
     
     # Timestamp
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -87,3 +113,59 @@ class MemoryEdge(Base):
     
     def __repr__(self):
         return f"<MemoryEdge(source={self.source_id}, target={self.target_id}, weight={self.weight:.3f})>"
+
+
+class IntentDecision(Base):
+    """
+    A trusted save/ask decision for /process input (LLM tool call or user
+    override), used as a training example by the local intent router.
+    """
+    __tablename__ = "intent_decision"
+
+    id = Column(Integer, primary_key=True, index=True)
+    text = Column(Text, nullable=False)
+    intent = Column(String(10), nullable=False)  # "save" or "ask"
+    decider = Column(String(20), nullable=False)  # "tool_calling", "override" or "audit"
+    embedding = Column(Vector(config.embedding_dimension), nullable=True)
+    
+    # Timestamp
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        text_preview = self.text[:50] + "..." if len(self.text) > 50 else self.text
+        return f"<IntentDecision(id={self.id}, intent={self.intent}, decider={self.decider}, text='{text_preview}')>"
+
+
+class IngestJob(Base):
+    """
+    Background enrichment of a memory stored with its raw text only
+    (category detection, chunking and embedding, linking to similar memories).
+    """
+    __tablename__ = "ingest_job"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Kept (as NULL) when the memory is deleted, so the job can report why it failed
+    memory_id = Column(
+        Integer,
+        ForeignKey("memory.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+    status = Column(String(20), nullable=False, server_default="pending")  # pending, running, succeeded, failed
+    auto_categorize = Column(Boolean, nullable=False, server_default="true")
+    attempts = Column(Integer, nullable=False, server_default="0")
+    error = Column(Text, nullable=True)  # Last failure, if any
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)  # Start of the current attempt's lease
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Unfinished jobs are resumed at startup
+    __table_args__ = (
+        Index('idx_ingest_job_status', status),
+    )
+    
+    def __repr__(self):
+        return f"<IngestJob(id={self.id}, memory_id={self.memory_id}, status={self.status}, attempts={self.attempts})>"
@@ -0,0 +1,121 @@
+"""
+Shared model provider clients (OpenAI, Anthropic).
+
+Every caller gets the same client per provider and API key, so all requests
+share one pooled HTTP connection per host instead of paying a TLS handshake
+for each new client. Connections use HTTP/2 when the `h2` package is installed
+and can be opened ahead of the first request with warm_up().
+"""
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import anthropic
+import httpx
+import openai
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# (provider, api_key) -> (SDK client, its pooled httpx client)
+_clients: Dict[Tuple[str, str], Tuple[Any, httpx.Client]] = {}
+_lock = threading.Lock()
+
+
+def http2_available() -> bool:
+    """Whether HTTP/2 is enabled and supported (httpx needs the optional h2 package)."""
+    if not config.provider_http2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _http_options() -> Dict[str, Any]:
+    """Connection pool settings shared by every provider's HTTP client."""
+    return {
+        "http2": http2_available(),
+        "limits": httpx.Limits(
+            max_connections=config.provider_max_connections,
+            max_keepalive_connections=config.provider_max_keepalive_connections,
+            keepalive_expiry=config.provider_keepalive_expiry,
+        ),
+    }
+
+
+def _get_client(provider: str, api_key: str, client_class, http_client_class) -> Any:
+    """Return the cached client for (provider, api_key), creating it on first use."""
+    key = (provider, api_key)
+    entry = _clients.get(key)
+    if entry is None:
+        with _lock:
+            entry = _clients.get(key)
+            if entry is None:
+                http_client = http_client_class(**_http_options())
+                entry = (client_class(api_key=api_key, http_client=http_client), http_client)
+                _clients[key] = entry
+    return entry[0]
+
+
+def get_openai_client(api_key: Optional[str] = None) -> openai.OpenAI:
+    """
+    Get the shared OpenAI client.
+
+    Args:
+        api_key: OpenAI API key (uses config if not provided)
+
+    Returns:
+        The OpenAI client for that key
+    """
+    api_key = api_key or config.openai_api_key
+    return _get_client("openai", api_key, openai.OpenAI, openai.DefaultHttpxClient)
+
+
+def get_anthropic_client(api_key: Optional[str] = None) -> anthropic.Anthropic:
+    """
+    Get the shared Anthropic client.
+
+    Args:
+        api_key: Anthropic API key (uses config if not provided)
+
+    Returns:
+        The Anthropic client for that key
+    """
+    api_key = api_key or config.anthropic_api_key
+    return _get_client("anthropic", api_key, anthropic.Anthropic, anthropic.DefaultHttpxClient)
+
+
+def warm_up():
+    """
+    Open a connection to each configured provider so the first real request
+    skips DNS, TCP and TLS setup. Failures are logged and otherwise ignored.
+    """
+    if config.openai_api_key:
+        get_openai_client()
+    if config.anthropic_api_key:
+        get_anthropic_client()
+
+    with _lock:
+        entries = list(_clients.items())
+    for (provider, _), (client, http_client) in entries:
+        try:
+            # Any response will do; the connection stays in the keep-alive pool
+            http_client.head(str(client.base_url))
+            logger.info(f"Warmed up {provider} connection (HTTP/2: {http2_available()})")
+        except Exception as e:
+            logger.warning(f"Failed to warm up {provider} connection: {e}")
+
+
+def close_clients():
+    """Close every shared client and its connections."""
+    with _lock:
+        clients = [client for client, _ in _clients.values()]
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning(f"Failed to close provider client: {e}")
@@ -1,23 +1,67 @@
 from typing import List, Optional, Tuple, Dict, Any
 from contextlib import contextmanager
+from datetime import datetime
+import base64
+import heapq
+import json
 import logging
+import threading
+import time
 
 import numpy as np
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, delete
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import (
+    Integer, select, insert, func, delete, tuple_, or_, cast, column, values, literal,
+    true as sql_true, text as sql_text,
+)
 from sqlalchemy.exc import SQLAlchemyError
-from anthropic import Anthropic
+from pgvector.sqlalchemy import Vector, HALFVEC, BIT
 
 from database import SessionLocal, Base, engine
-from models import Memory, MemoryChunk, MemoryEdge
+from models import (
+    Memory,
+    MemoryChunk,
+    MemoryEdge,
+    IngestJob,
+    memory_text_search_vector,
+    text_search_regconfig,
+)
 from embeddings import EmbeddingGenerator
 from graph_store import MemoryGraphStore
 from chunking import TextChunker
+from cache import LRUCache
+from vector_index import VectorIndexManager
 from config import config
 from category_detector import detect_category
+from providers import get_anthropic_client
 
 logger = logging.getLogger(__name__)
 
+SEARCH_MODES = ("vector", "hybrid", "hierarchical", "graph")
+
+
+def _encode_cursor(created_at: datetime, memory_id: int) -> str:
+    """
+    Encode a keyset position (created_at, id) as an opaque URL-safe cursor.
+    """
+    payload = json.dumps([created_at.isoformat(), memory_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by _encode_cursor.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, memory_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(memory_id)
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
 
 class RagMemoryService:
     """
@@ -52,12 +96,52 @@ class RagMemoryService:
             chunk_overlap_words: Number of overlapping words (defaults to config value)
             enable_query_enhancement: Whether to enable AI-powered query enhancement
         """
-        self.embedding_generator = EmbeddingGenerator()
+        self.embedding_generator = EmbeddingGenerator(
+            model_name=config.embedding_model,
+            cache_enabled=config.cache_enabled,
+            max_cache_size=config.max_cache_size,
+            dimensions=config.embedding_dimension,
+        )
         self.graph_store = MemoryGraphStore()
+        self.vector_index = VectorIndexManager(
+            engine,
+            maintenance_work_mem=config.vector_index_maintenance_work_mem or None,
+            storage=config.vector_storage,
+            dimensions=config.embedding_dimension,
+        )
+        self.centroid_index = VectorIndexManager(
+            engine,
+            table="memory",
+            column="centroid_embedding",
+            index_name="idx_memory_centroid_cosine",
+            maintenance_work_mem=config.vector_index_maintenance_work_mem or None,
+            dimensions=config.embedding_dimension,
+        )
         self.similarity_threshold = similarity_threshold
         self.max_similar_connections = max_similar_connections
         self.enable_query_enhancement = enable_query_enhancement
         
+        # Read caches, invalidated by every write through _invalidate_read_caches()
+        self._cache_lock = threading.Lock()
+        self._write_generation = 0
+        
+        # Statistics maintained on the write paths and reconciled periodically
+        self._category_counts: Optional[Dict[Optional[str], int]] = None
+        self._category_counts_at = 0.0
+        self._stats_counters: Optional[Dict[str, int]] = None
+        self._stats_reconciled_at = 0.0
+        # (chunks per memory, monotonic time) from the catalog, used until the counters are loaded
+        self._chunks_per_memory_estimate: Optional[Tuple[float, float]] = None
+        
+        # Hot memories by ID (detached Memory objects). Writes in this process
+        # invalidate entries; the TTL bounds staleness from other processes
+        self._memory_cache = LRUCache(max_size=config.memory_cache_size, ttl=config.memory_cache_ttl or None)
+        
+        # Search results as (write_generation, [(memory_id, score), ...]);
+        # entries from an older generation are treated as misses. The generation
+        # only tracks this process's writes, so the TTL bounds staleness from others
+        self._search_cache = LRUCache(max_size=config.search_cache_size, ttl=config.search_cache_ttl or None)
+        
         # Initialize text chunker
         self.chunker = TextChunker(
             chunk_size_words=chunk_size_words or config.chunk_size_words,
@@ -66,7 +150,7 @@ class RagMemoryService:
         
         # Initialize Anthropic client for query enhancement
         if self.enable_query_enhancement and config.anthropic_api_key:
-            self.anthropic_client = Anthropic(api_key=config.anthropic_api_key)
+            self.anthropic_client = get_anthropic_client()
         else:
             self.anthropic_client = None
             if self.enable_query_enhancement:
@@ -80,6 +164,14 @@ class RagMemoryService:
                 logger.error(f"Failed to create schema: {e}")
                 raise
         
+        # Vector indexes come from the migrations (004, 006) and
+        # POST /rebuild-vector-index; startup only reports missing ones
+        try:
+            self.vector_index.check()
+            self.centroid_index.check()
+        except SQLAlchemyError as e:
+            logger.warning(f"Failed to inspect vector indexes: {e}")
+        
         if load_graph:
             try:
                 with self._get_session_context() as session:
@@ -111,6 +203,134 @@ class RagMemoryService:
         """
         return SessionLocal()
 
+    @staticmethod
+    def _memory_columns(preview_chars: Optional[int] = None, include_text: bool = True) -> List[Any]:
+        """
+        Columns to load for memory read results.
+        Text truncation is pushed into SQL with left() so full texts are never
+        transferred when only a preview is needed.
+        
+        Args:
+            preview_chars: Truncate text to this many characters (None for full text)
+            include_text: Whether to load text at all
+            
+        Returns:
+            List of column expressions for select()
+        """
+        columns = [Memory.id, Memory.category, Memory.source, Memory.created_at, Memory.updated_at]
+        if include_text:
+            if preview_chars is not None:
+                # One extra character tells us whether the text was truncated
+                columns.append(func.left(Memory.text, preview_chars + 1).label("text"))
+            else:
+                columns.append(Memory.text)
+        return columns
+
+    @staticmethod
+    def _memory_from_row(row: Any, preview_chars: Optional[int] = None) -> Memory:
+        """
+        Build a detached Memory from a row selected with _memory_columns.
+        """
+        text = getattr(row, "text", None)
+        if text is not None and preview_chars is not None and len(text) > preview_chars:
+            text = text[:preview_chars] + "..."
+        return Memory(
+            id=row.id,
+            text=text,
+            category=row.category,
+            source=row.source,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+
+    def _load_memories_by_ids(
+        self,
+        session: Session,
+        memory_ids: List[int],
+        preview_chars: Optional[int] = None,
+        include_text: bool = True,
+    ) -> Dict[int, Memory]:
+        """
+        Load several memories in a single query.
+        
+        Args:
+            session: Database session
+            memory_ids: IDs of the memories to load
+            preview_chars: Truncate text to this many characters (None for full text)
+            include_text: Whether to load text at all
+            
+        Returns:
+            Dictionary mapping memory ID to detached Memory (missing IDs are absent)
+        """
+        if not memory_ids:
+            return {}
+        
+        rows = session.execute(
+            select(*self._memory_columns(preview_chars, include_text))
+            .where(Memory.id.in_(memory_ids))
+        ).all()
+        return {row.id: self._memory_from_row(row, preview_chars) for row in rows}
+
+    @staticmethod
+    def _copy_memory(memory: Memory) -> Memory:
+        """Return a detached copy of a Memory so cached instances are never shared."""
+        return Memory(
+            id=memory.id,
+            text=memory.text,
+            category=memory.category,
+            source=memory.source,
+            created_at=memory.created_at,
+            updated_at=memory.updated_at,
+        )
+
+    def _invalidate_read_caches(self, memory_ids: Optional[List[int]] = None):
+        """
+        Drop cached read results after a write.
+        Bumping the write generation also prevents readers that started
+        before the write from storing stale results.
+        
+        Args:
+            memory_ids: IDs of memories whose cached copies must be dropped
+        """
+        with self._cache_lock:
+            self._write_generation += 1
+        for memory_id in memory_ids or []:
+            self._memory_cache.pop(memory_id)
+
+    def _apply_stats_delta(
+        self,
+        memories: int = 0,
+        chunks: int = 0,
+        edges: int = 0,
+        categories: Optional[Dict[Optional[str], int]] = None,
+    ):
+        """
+        Apply a committed write to the maintained statistics counters.
+        Counters that are not loaded yet are left alone; they will be
+        computed exactly on the next read.
+        
+        Args:
+            memories: Change in number of memory rows
+            chunks: Change in number of chunk rows
+            edges: Change in number of (directed) edge rows
+            categories: Change in memory count per category
+        """
+        with self._cache_lock:
+            self._write_generation += 1
+            
+            if self._stats_counters is not None:
+                self._stats_counters["memories"] += memories
+                self._stats_counters["chunks"] += chunks
+                self._stats_counters["edges"] += edges
+            
+            if self._category_counts is not None and categories:
+                for category, delta in categories.items():
+                    count = self._category_counts.get(category, 0) + delta
+                    if count > 0:
+                        self._category_counts[category] = count
+                    else:
+                        self._category_counts.pop(category, None)
+
     # -------- Memory operations --------
 
     def add_memory(
@@ -172,10 +392,12 @@ class RagMemoryService:
                 text=text,
                 category=category,
                 source=source,
+                centroid_embedding=self._memory_centroid(chunk_embeddings),
             )
             session.add(memory)
             session.commit()
             session.refresh(memory)
+            self._apply_stats_delta(memories=1, categories={category: 1})
             
             logger.info(f"Created memory {memory.id} with {len(chunk_texts)} chunks")
 
@@ -192,66 +414,21 @@ class RagMemoryService:
                 chunks.append(chunk)
             
             session.commit()
+            self._apply_stats_delta(chunks=len(chunks))
             
             # Add to graph
             self.graph_store.add_memory_node(memory.id)
 
             # Find and connect similar memories based on chunk similarity
-            similar_memories = self._find_similar_memories_by_chunks(
-                session=session,
-                chunk_embeddings=chunk_embeddings,
-                exclude_memory_id=memory.id,
-            )
-
-            edges_created = 0
-            for sim_memory_id, similarity_score in similar_memories:
-                # Only create edge if similarity exceeds threshold
-                if similarity_score < self.similarity_threshold:
-                    continue
-
-                # Check if edges already exist
-                existing_forward = session.get(MemoryEdge, (memory.id, sim_memory_id))
-                existing_backward = session.get(MemoryEdge, (sim_memory_id, memory.id))
-                
-                if existing_forward:
-                    # Update existing edge weight
-                    existing_forward.weight = similarity_score
-                    logger.debug(f"Updated edge {memory.id} -> {sim_memory_id}")
-                else:
-                    # Create new forward edge
-                    edge_forward = MemoryEdge(
-                        source_id=memory.id,
-                        target_id=sim_memory_id,
-                        weight=similarity_score,
-                    )
-                    session.add(edge_forward)
-                
-                if existing_backward:
-                    # Update existing edge weight
-                    existing_backward.weight = similarity_score
-                    logger.debug(f"Updated edge {sim_memory_id} -> {memory.id}")
-                else:
-                    # Create new backward edge
-                    edge_backward = MemoryEdge(
-                        source_id=sim_memory_id,
-                        target_id=memory.id,
-                        weight=similarity_score,
-                    )
-                    session.add(edge_backward)
-                
-                # Add/update in-memory graph
-                self.graph_store.add_similarity_edge(
-                    memory.id,
-                    sim_memory_id,
-                    similarity_score,
-                )
-                
-                edges_created += 1
+            linked, edge_rows_added = self._link_similar_memories(session, memory.id, chunk_embeddings)
 
             session.commit()
+            self._apply_stats_delta(edges=edge_rows_added)
+            for sim_memory_id, similarity_score in linked:
+                self.graph_store.add_similarity_edge(memory.id, sim_memory_id, similarity_score)
             session.refresh(memory)
             
-            logger.info(f"Memory {memory.id} connected to {edges_created} similar memories")
+            logger.info(f"Memory {memory.id} connected to {len(linked)} similar memories")
             
             # Ensure all attributes are loaded before closing session
             _ = memory.id
@@ -268,6 +445,211 @@ class RagMemoryService:
             raise
         finally:
             session.close()
+            self._invalidate_read_caches()
+
+    def _link_similar_memories(
+        self,
+        session: Session,
+        memory_id: int,
+        chunk_embeddings: List[List[float]],
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """
+        Create or update edges in both directions between a memory and the
+        memories similar to its chunks (not committed; the in-memory graph is
+        left to the caller, once the edges are committed).
+        
+        Args:
+            session: Database session
+            memory_id: The memory to connect
+            chunk_embeddings: The memory's chunk embeddings
+            
+        Returns:
+            ([(similar_memory_id, similarity), ...] for each linked memory,
+            number of edge rows added)
+        """
+        similar_memories = self._find_similar_memories_by_chunks(
+            session=session,
+            chunk_embeddings=chunk_embeddings,
+            exclude_memory_id=memory_id,
+        )
+
+        linked = []
+        edge_rows_added = 0
+        for sim_memory_id, similarity_score in similar_memories:
+            # Only create edge if similarity exceeds threshold
+            if similarity_score < self.similarity_threshold:
+                continue
+
+            for source_id, target_id in ((memory_id, sim_memory_id), (sim_memory_id, memory_id)):
+                existing = session.get(MemoryEdge, (source_id, target_id))
+                if existing:
+                    # Update existing edge weight
+                    existing.weight = similarity_score
+                    logger.debug(f"Updated edge {source_id} -> {target_id}")
+                else:
+                    session.add(MemoryEdge(
+                        source_id=source_id,
+                        target_id=target_id,
+                        weight=similarity_score,
+                    ))
+                    edge_rows_added += 1
+
+            linked.append((sim_memory_id, similarity_score))
+        return linked, edge_rows_added
+
+    def add_memory_deferred(
+        self,
+        text: str,
+        category: Optional[str] = None,
+        source: Optional[str] = None,
+        auto_categorize: bool = True,
+    ) -> IngestJob:
+        """
+        Store a memory's raw text and queue its enrichment, in a single INSERT.
+        The memory is not searchable until enrich_memory() has run for the job.
+        
+        Args:
+            text: The full text content of the memory
+            category: Optional category/tag for the memory
+            source: Optional source identifier
+            auto_categorize: Whether enrichment should auto-detect the category
+            
+        Returns:
+            The created (detached) IngestJob, in 'pending' status
+            
+        Raises:
+            ValueError: If text is empty
+            SQLAlchemyError: If database operation fails
+        """
+        if not text or not text.strip():
+            raise ValueError("Memory text cannot be empty")
+        
+        new_memory = (
+            insert(Memory)
+            .values(text=text.strip(), category=category, source=source)
+            .returning(Memory.id)
+            .cte("new_memory")
+        )
+        stmt = (
+            insert(IngestJob)
+            .from_select(
+                ["memory_id", "auto_categorize"],
+                select(new_memory.c.id, literal(auto_categorize)),
+            )
+            .returning(IngestJob)
+        )
+        
+        session = self._get_session()
+        try:
+            job = session.execute(select(IngestJob).from_statement(stmt)).scalar_one()
+            session.commit()
+            session.expunge(job)
+            self._apply_stats_delta(memories=1, categories={category: 1})
+            self.graph_store.add_memory_node(job.memory_id)
+            logger.info(f"Stored memory {job.memory_id}, enrichment queued as job {job.id}")
+            return job
+        except SQLAlchemyError as e:
+            logger.error(f"Database error storing deferred memory: {e}")
+            raise
+        finally:
+            session.close()
+            self._invalidate_read_caches()
+
+    def enrich_memory(self, memory_id: int, auto_categorize: bool = True) -> Optional[Memory]:
+        """
+        Run the enrichment stages of a memory stored with add_memory_deferred():
+        category detection, chunking and embedding, and linking to similar memories.
+        Everything is committed at once, and chunks or edges left by an earlier
+        run are replaced, so a failed or repeated run can simply be retried.
+        
+        Args:
+            memory_id: The ID of the memory to enrich
+            auto_categorize: Whether to auto-detect the category
+            
+        Returns:
+            The enriched Memory object, or None if the memory no longer exists
+            
+        Raises:
+            ValueError: If the text cannot be chunked
+            SQLAlchemyError: If database operation fails
+        """
+        session = self._get_session()
+        try:
+            # Row lock: a concurrent run for the same memory (e.g. after a lease
+            # takeover) waits here instead of interleaving its deletes and inserts
+            memory = session.get(Memory, memory_id, with_for_update=True)
+            if not memory:
+                logger.warning(f"Memory {memory_id} not found for enrichment")
+                return None
+            old_category = memory.category
+            
+            if auto_categorize:
+                try:
+                    detected_category = detect_category(memory.text)
+                    if detected_category:
+                        memory.category = detected_category
+                        logger.info(f"Auto-detected category: {detected_category}")
+                except Exception as e:
+                    logger.warning(f"Category auto-detection failed: {e}")
+            
+            chunk_texts = self.chunker.split_text(memory.text)
+            if not chunk_texts:
+                raise ValueError("Failed to create chunks from text")
+            chunk_embeddings = self.embedding_generator.generate_embeddings_batch(chunk_texts)
+            
+            # Leftovers from a previous run of this job
+            chunk_delta = -session.execute(
+                delete(MemoryChunk).where(MemoryChunk.memory_id == memory_id)
+            ).rowcount
+            removed_edges = session.execute(
+                delete(MemoryEdge).where(
+                    or_(MemoryEdge.source_id == memory_id, MemoryEdge.target_id == memory_id)
+                )
+            ).rowcount
+            
+            for idx, (chunk_text, chunk_embedding) in enumerate(zip(chunk_texts, chunk_embeddings)):
+                session.add(MemoryChunk(
+                    memory_id=memory_id,
+                    chunk_text=chunk_text,
+                    chunk_index=idx,
+                    embedding=chunk_embedding,
+                ))
+            chunk_delta += len(chunk_texts)
+            memory.centroid_embedding = self._memory_centroid(chunk_embeddings)
+            session.flush()
+            
+            linked, edge_rows_added = self._link_similar_memories(session, memory_id, chunk_embeddings)
+            edge_delta = edge_rows_added - removed_edges
+            
+            session.commit()
+            category_deltas = None
+            if memory.category != old_category:
+                category_deltas = {old_category: -1, memory.category: 1}
+            self._apply_stats_delta(chunks=chunk_delta, edges=edge_delta, categories=category_deltas)
+            
+            # Runs on ingest workers; readers see the old or the new edges, never a mix
+            with self.graph_store.lock:
+                if removed_edges:
+                    self.graph_store.remove_memory_node(memory_id)
+                self.graph_store.add_memory_node(memory_id)
+                for sim_memory_id, similarity_score in linked:
+                    self.graph_store.add_similarity_edge(memory_id, sim_memory_id, similarity_score)
+            
+            logger.info(
+                f"Enriched memory {memory_id}: {len(chunk_texts)} chunks, "
+                f"connected to {len(linked)} similar memories"
+            )
+            
+            session.refresh(memory)
+            _ = memory.text
+            session.expunge(memory)
+            return memory
+        except SQLAlchemyError as e:
+            logger.error(f"Database error enriching memory {memory_id}: {e}")
+            raise
+        finally:
+            session.close()
+            self._invalidate_read_caches(memory_ids=[memory_id])
 
     def add_memories_batch(
         self,
@@ -355,9 +737,12 @@ class RagMemoryService:
             session.commit()
             
             # Refresh to get IDs
+            category_deltas: Dict[Optional[str], int] = {}
             for memory in memories:
                 session.refresh(memory)
                 self.graph_store.add_memory_node(memory.id)
+                category_deltas[memory.category] = category_deltas.get(memory.category, 0) + 1
+            self._apply_stats_delta(memories=len(memories), categories=category_deltas)
             
             logger.info(f"Created {len(memories)} memories in batch")
             
@@ -383,13 +768,19 @@ class RagMemoryService:
                     memory_chunk_embeddings[memory.id] = []
                 memory_chunk_embeddings[memory.id].append(embedding)
             
+            for memory in memories:
+                if memory.id in memory_chunk_embeddings:
+                    memory.centroid_embedding = self._memory_centroid(memory_chunk_embeddings[memory.id])
+            
             session.commit()
+            self._apply_stats_delta(chunks=len(all_chunks_data))
             
             logger.info(f"Created {len(all_chunks_data)} chunks in batch")
             
             # Connect similar memories
             # Track edges created in this batch to avoid duplicates
             edges_in_batch = set()
+            edge_rows_added = 0
             
             for memory in memories:
                 chunk_embeddings = memory_chunk_embeddings.get(memory.id, [])
@@ -428,6 +819,7 @@ class RagMemoryService:
                         )
                         session.add(edge_forward)
                         edges_in_batch.add(edge_forward_key)
+                        edge_rows_added += 1
                     
                     # Handle backward edge
                     if existing_backward:
@@ -443,6 +835,7 @@ class RagMemoryService:
                         )
                         session.add(edge_backward)
                         edges_in_batch.add(edge_backward_key)
+                        edge_rows_added += 1
                     
                     # Add/update in-memory graph
                     self.graph_store.add_similarity_edge(
@@ -452,6 +845,7 @@ class RagMemoryService:
                     )
             
             session.commit()
+            self._apply_stats_delta(edges=edge_rows_added)
             
             # Expunge all memories
             for memory in memories:
@@ -469,10 +863,12 @@ class RagMemoryService:
             raise
         finally:
             session.close()
+            self._invalidate_read_caches()
 
     def get_memory(self, memory_id: int) -> Optional[Memory]:
         """
         Retrieve a memory by its ID.
+        Read-through the in-process LRU cache, which is invalidated by writes.
         
         Args:
             memory_id: The ID of the memory to retrieve
@@ -480,6 +876,13 @@ class RagMemoryService:
         Returns:
             The Memory object if found, None otherwise
         """
+        cached = self._memory_cache.get(memory_id)
+        if cached is not None:
+            return self._copy_memory(cached)
+        
+        with self._cache_lock:
+            generation = self._write_generation
+        
         session = self._get_session()
         try:
             memory = session.get(Memory, memory_id)
@@ -488,15 +891,22 @@ class RagMemoryService:
                 _ = memory.id
                 _ = memory.text
                 _ = memory.created_at
+                _ = memory.updated_at
                 _ = memory.category
                 _ = memory.source
                 session.expunge(memory)
-            return memory
         except SQLAlchemyError as e:
             logger.error(f"Database error retrieving memory {memory_id}: {e}")
             raise
         finally:
             session.close()
+        
+        if memory:
+            with self._cache_lock:
+                # Only cache if no write happened while we were querying
+                if generation == self._write_generation:
+                    self._memory_cache.put(memory_id, self._copy_memory(memory))
+        return memory
 
     def get_memory_chunks(self, memory_id: int) -> List[MemoryChunk]:
         """
@@ -531,6 +941,31 @@ class RagMemoryService:
         finally:
             session.close()
 
+    def get_memory_versions(self, memory_ids: List[int]) -> Dict[int, Any]:
+        """
+        Current version of each memory, i.e. its last update (or creation) time.
+        
+        Args:
+            memory_ids: IDs of the memories
+            
+        Returns:
+            Dictionary mapping memory ID to its version (missing IDs are absent)
+        """
+        if not memory_ids:
+            return {}
+        session = self._get_session()
+        try:
+            rows = session.execute(
+                select(Memory.id, func.coalesce(Memory.updated_at, Memory.created_at))
+                .where(Memory.id.in_(memory_ids))
+            ).all()
+            return {memory_id: version for memory_id, version in rows}
+        except SQLAlchemyError as e:
+            logger.error(f"Database error retrieving memory versions: {e}")
+            raise
+        finally:
+            session.close()
+
     def delete_memory(self, memory_id: int) -> bool:
         """
         Delete a memory and all its edges.
@@ -548,8 +983,25 @@ class RagMemoryService:
                 logger.warning(f"Memory {memory_id} not found for deletion")
                 return False
             
+            # Count rows removed by the cascade (indexed lookups) for the statistics counters
+            chunk_count = session.execute(
+                select(func.count(MemoryChunk.id)).where(MemoryChunk.memory_id == memory_id)
+            ).scalar() or 0
+            edge_count = session.execute(
+                select(func.count()).select_from(MemoryEdge).where(
+                    or_(MemoryEdge.source_id == memory_id, MemoryEdge.target_id == memory_id)
+                )
+            ).scalar() or 0
+            category = memory.category
+            
             session.delete(memory)
             session.commit()
+            self._apply_stats_delta(
+                memories=-1,
+                chunks=-chunk_count,
+                edges=-edge_count,
+                categories={category: -1},
+            )
             
             # Remove from graph
             self.graph_store.remove_memory_node(memory_id)
@@ -562,6 +1014,7 @@ class RagMemoryService:
             raise
         finally:
             session.close()
+            self._invalidate_read_caches(memory_ids=[memory_id])
 
     def update_memory(
         self,
@@ -590,6 +1043,10 @@ class RagMemoryService:
                 logger.warning(f"Memory {memory_id} not found for update")
                 return None
             
+            old_category = memory.category
+            chunk_delta = 0
+            edge_delta = 0
+            
             # Update metadata
             if category is not None:
                 memory.category = category
@@ -605,9 +1062,10 @@ class RagMemoryService:
                 memory.text = text
                 
                 # Delete old chunks (cascade will handle this, but explicit is clearer)
-                session.execute(
+                deleted_chunks = session.execute(
                     delete(MemoryChunk).where(MemoryChunk.memory_id == memory_id)
                 )
+                chunk_delta -= deleted_chunks.rowcount
                 
                 # Split text into chunks
                 chunk_texts = self.chunker.split_text(text)
@@ -630,13 +1088,16 @@ class RagMemoryService:
                         embedding=chunk_embedding,
                     )
                     session.add(chunk)
+                chunk_delta += len(chunk_texts)
+                memory.centroid_embedding = self._memory_centroid(chunk_embeddings)
                 
                 # Delete old edges
-                session.execute(
+                deleted_edges = session.execute(
                     delete(MemoryEdge).where(
                         (MemoryEdge.source_id == memory_id) | (MemoryEdge.target_id == memory_id)
                     )
                 )
+                edge_delta -= deleted_edges.rowcount
                 
                 # Recreate edges based on new chunks
                 similar_memories = self._find_similar_memories_by_chunks(
@@ -664,6 +1125,7 @@ class RagMemoryService:
                             weight=similarity_score,
                         )
                         session.add(edge_forward)
+                        edge_delta += 1
                     
                     if existing_backward:
                         # Update existing edge weight
@@ -676,8 +1138,13 @@ class RagMemoryService:
                             weight=similarity_score,
                         )
                         session.add(edge_backward)
+                        edge_delta += 1
             
             session.commit()
+            category_deltas = None
+            if memory.category != old_category:
+                category_deltas = {old_category: -1, memory.category: 1}
+            self._apply_stats_delta(chunks=chunk_delta, edges=edge_delta, categories=category_deltas)
             session.refresh(memory)
             
             # Reload graph if text changed
@@ -701,12 +1168,15 @@ class RagMemoryService:
             raise
         finally:
             session.close()
+            self._invalidate_read_caches(memory_ids=[memory_id])
 
     def get_all_memories(
         self,
         limit: Optional[int] = None,
         offset: int = 0,
         category: Optional[str] = None,
+        preview_chars: Optional[int] = None,
+        include_text: bool = True,
     ) -> List[Memory]:
         """
         Retrieve all memories with optional filtering and pagination.
@@ -715,13 +1185,18 @@ class RagMemoryService:
             limit: Maximum number of memories to return
             offset: Number of memories to skip
             category: Filter by category
+            preview_chars: Truncate text to this many characters (None for full text)
+            include_text: Whether to load text at all
             
         Returns:
             List of Memory objects
         """
         session = self._get_session()
         try:
-            stmt = select(Memory).order_by(Memory.created_at.desc())
+            stmt = (
+                select(*self._memory_columns(preview_chars, include_text))
+                .order_by(Memory.created_at.desc(), Memory.id.desc())
+            )
             
             if category:
                 stmt = stmt.where(Memory.category == category)
@@ -732,21 +1207,73 @@ class RagMemoryService:
             if limit:
                 stmt = stmt.limit(limit)
             
-            memories = session.execute(stmt).scalars().all()
+            rows = session.execute(stmt).all()
+            return [self._memory_from_row(row, preview_chars) for row in rows]
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Database error retrieving memories: {e}")
+            raise
+        finally:
+            session.close()
+
+    def get_memories_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        category: Optional[str] = None,
+        preview_chars: Optional[int] = None,
+        include_text: bool = True,
+    ) -> Tuple[List[Memory], Optional[str]]:
+        """
+        Retrieve a page of memories using keyset pagination on (created_at, id).
+        Unlike offset pagination, deep pages cost the same as the first one.
+        
+        Args:
+            limit: Maximum number of memories to return
+            cursor: Opaque cursor returned by a previous call (None for first page)
+            category: Filter by category
+            preview_chars: Truncate text to this many characters (None for full text)
+            include_text: Whether to load text at all
             
-            # Expunge all
-            for memory in memories:
-                _ = memory.id
-                _ = memory.text
-                _ = memory.created_at
-                _ = memory.category
-                _ = memory.source
-                session.expunge(memory)
+        Returns:
+            Tuple of (memories, next_cursor). next_cursor is None on the last page.
             
-            return memories
+        Raises:
+            ValueError: If limit is not positive or the cursor is invalid
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        
+        session = self._get_session()
+        try:
+            stmt = (
+                select(*self._memory_columns(preview_chars, include_text))
+                .order_by(Memory.created_at.desc(), Memory.id.desc())
+            )
+            
+            if category:
+                stmt = stmt.where(Memory.category == category)
+            
+            if cursor:
+                cursor_created_at, cursor_id = _decode_cursor(cursor)
+                stmt = stmt.where(
+                    tuple_(Memory.created_at, Memory.id) < tuple_(cursor_created_at, cursor_id)
+                )
+            
+            # Fetch one extra row to know whether there is a next page
+            rows = session.execute(stmt.limit(limit + 1)).all()
+            has_more = len(rows) > limit
+            memories = [self._memory_from_row(row, preview_chars) for row in rows[:limit]]
+            
+            next_cursor = None
+            if has_more and memories:
+                last = memories[-1]
+                next_cursor = _encode_cursor(last.created_at, last.id)
+            
+            return memories, next_cursor
             
         except SQLAlchemyError as e:
-            logger.error(f"Database error retrieving memories: {e}")
+            logger.error(f"Database error retrieving memories page: {e}")
             raise
         finally:
             session.close()
@@ -754,6 +1281,7 @@ class RagMemoryService:
     def count_memories(self, category: Optional[str] = None) -> int:
         """
         Count total number of memories.
+        Served from the cached category counts.
         
         Args:
             category: Optional category filter
@@ -761,21 +1289,51 @@ class RagMemoryService:
         Returns:
             Number of memories
         """
+        counts = self.get_category_counts()
+        if category:
+            return counts.get(category, 0)
+        return sum(counts.values())
+
+    def get_category_counts(self) -> Dict[Optional[str], int]:
+        """
+        Count memories per category with a single GROUP BY query.
+        
+        The result is cached in-process and kept current by the write paths
+        (_apply_stats_delta). A write that commits before the query but applies
+        its delta after the result is cached is counted twice, so the counts
+        are recomputed every config.stats_reconcile_interval seconds, which
+        bounds that drift.
+        
+        Returns:
+            Dictionary mapping category (None for uncategorized) to memory count
+        """
+        with self._cache_lock:
+            fresh = time.monotonic() - self._category_counts_at <= config.stats_reconcile_interval
+            if self._category_counts is not None and fresh:
+                return dict(self._category_counts)
+            generation = self._write_generation
+        
         session = self._get_session()
         try:
-            stmt = select(func.count(Memory.id))
-            
-            if category:
-                stmt = stmt.where(Memory.category == category)
-            
-            count = session.execute(stmt).scalar()
-            return count or 0
+            rows = session.execute(
+                select(Memory.category, func.count(Memory.id))
+                .group_by(Memory.category)
+            ).all()
+            counts = {category: count for category, count in rows}
             
         except SQLAlchemyError as e:
-            logger.error(f"Database error counting memories: {e}")
+            logger.error(f"Database error counting memories by category: {e}")
             raise
         finally:
             session.close()
+        
+        with self._cache_lock:
+            # Only cache if no write happened while we were querying
+            if generation == self._write_generation:
+                self._category_counts = counts
+                self._category_counts_at = time.monotonic()
+        
+        return dict(counts)
 
     # -------- Similarity search --------
 
@@ -789,6 +1347,10 @@ class RagMemoryService:
         Find similar memories by comparing chunk embeddings.
         Returns aggregated similarity scores per memory.
         
+        Candidates come from a single ANN query on memory centroids, so linking
+        a long memory costs the same as a short one. With config.centroid_refine,
+        candidates are re-scored on their best chunk pair (max similarity).
+        
         Args:
             session: Database session
             chunk_embeddings: List of query chunk embeddings
@@ -797,94 +1359,619 @@ class RagMemoryService:
         Returns:
             List of (memory_id, similarity_score) tuples, sorted by score descending
         """
-        # For each query chunk, find similar chunks
-        memory_similarities: Dict[int, List[float]] = {}
-        
-        # We need to search more chunks to ensure we find enough unique memories
-        # Multiply by a larger factor to account for:
-        # 1. Multiple chunks per memory
-        # 2. The need to find max_similar_connections unique memories
-        chunk_search_limit = self.max_similar_connections * 10
-        
-        for query_embedding in chunk_embeddings:
-            # Find similar chunks using cosine distance
-            similar_chunks = self._get_similar_chunks_by_embedding(
-                session=session,
-                embedding=query_embedding,
-                limit=chunk_search_limit,
-            )
-            
-            # Group by memory and collect similarities
-            for chunk in similar_chunks:
-                if exclude_memory_id and chunk.memory_id == exclude_memory_id:
-                    continue
-                
-                similarity = self._calculate_cosine_similarity(
-                    query_embedding,
-                    chunk.embedding,
-                )
-                
-                if chunk.memory_id not in memory_similarities:
-                    memory_similarities[chunk.memory_id] = []
-                memory_similarities[chunk.memory_id].append(similarity)
+        if not chunk_embeddings:
+            return []
         
-        # Aggregate similarities per memory (use max similarity)
-        memory_scores = []
-        for memory_id, similarities in memory_similarities.items():
-            # Use max similarity as the representative score
-            max_similarity = max(similarities)
-            memory_scores.append((memory_id, max_similarity))
+        candidate_limit = self.max_similar_connections
+        if config.centroid_refine:
+            candidate_limit *= config.centroid_candidate_factor
+        
+        distance_expr = Memory.centroid_embedding.op("<=>")(self._memory_centroid(chunk_embeddings))
+        stmt = select(Memory.id, distance_expr.label("distance")).where(
+            Memory.centroid_embedding.is_not(None)
+        )
+        if exclude_memory_id is not None:
+            stmt = stmt.where(Memory.id != exclude_memory_id)
+        stmt = stmt.order_by(distance_expr).limit(candidate_limit)
         
-        # Sort by similarity descending
-        memory_scores.sort(key=lambda x: x[1], reverse=True)
+        ef = min(max(candidate_limit, 40), config.max_ef_search)
+        session.execute(sql_text(f"SET LOCAL hnsw.ef_search = {ef}"))
+        candidates = session.execute(stmt).all()
+        if not candidates:
+            return []
         
-        # Return top N
-        return memory_scores[:self.max_similar_connections]
+        if not config.centroid_refine:
+            return [
+                (row.id, max(0.0, min(1.0, 1.0 - float(row.distance) / 2.0)))
+                for row in candidates
+            ]
+        
+        # Best chunk pair per candidate, bounded by the candidates' chunks
+        chunk_rows = session.execute(
+            select(MemoryChunk.memory_id, MemoryChunk.embedding).where(
+                MemoryChunk.memory_id.in_([row.id for row in candidates])
+            )
+        ).all()
+        if not chunk_rows:
+            return []
+        
+        query_matrix = self._normalize_rows(np.asarray(chunk_embeddings, dtype=np.float32))
+        candidate_matrix = self._normalize_rows(
+            np.asarray([row.embedding for row in chunk_rows], dtype=np.float32)
+        )
+        best_cosines = (candidate_matrix @ query_matrix.T).max(axis=1)
+        
+        memory_scores: Dict[int, float] = {}
+        for row, cos_sim in zip(chunk_rows, best_cosines):
+            similarity = max(0.0, min(1.0, (float(cos_sim) + 1.0) / 2.0))
+            if similarity > memory_scores.get(row.memory_id, -1.0):
+                memory_scores[row.memory_id] = similarity
+        
+        # Sort by similarity descending and return top N
+        ranked = sorted(memory_scores.items(), key=lambda x: x[1], reverse=True)
+        return ranked[:self.max_similar_connections]
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        """L2-normalize each row of a matrix (zero rows are left as zeros)."""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _memory_centroid(self, chunk_embeddings: List[List[float]]) -> List[float]:
+        """
+        Compute a memory's summary vector: the mean of its normalized chunk embeddings.
+        
+        Args:
+            chunk_embeddings: The memory's chunk embeddings
+            
+        Returns:
+            Centroid embedding
+        """
+        matrix = self._normalize_rows(np.asarray(chunk_embeddings, dtype=np.float32))
+        return matrix.mean(axis=0).tolist()
+
+    @staticmethod
+    def backfill_memory_centroids(dimensions: Optional[int] = None) -> int:
+        """
+        Add the centroid column if missing and compute centroids for memories
+        that don't have one yet (created before centroids existed), in SQL.
+        Takes an exclusive lock on memory and updates every such row, so it is
+        run by reembed.py and migration 006, never on service startup.
+        
+        Args:
+            dimensions: Embedding dimension of the column (defaults to config.embedding_dimension)
+            
+        Returns:
+            Number of memories updated
+        """
+        dimensions = dimensions or config.embedding_dimension
+        with engine.begin() as conn:
+            conn.execute(sql_text(
+                f"ALTER TABLE memory ADD COLUMN IF NOT EXISTS centroid_embedding vector({dimensions})"
+            ))
+            result = conn.execute(sql_text(
+                "UPDATE memory SET centroid_embedding = c.centroid "
+                "FROM ("
+                "  SELECT memory_id, avg(l2_normalize(embedding)) AS centroid "
+                "  FROM memory_chunk "
+                "  WHERE memory_id IN (SELECT id FROM memory WHERE centroid_embedding IS NULL) "
+                "  GROUP BY memory_id"
+                ") AS c "
+                "WHERE memory.id = c.memory_id"
+            ))
+        if result.rowcount:
+            logger.info(f"Backfilled centroids for {result.rowcount} memories")
+        return result.rowcount
 
-    def _get_similar_chunks_by_embedding(
+    def _search_memory_scores(
         self,
         session: Session,
         embedding: List[float],
         limit: int = 10,
         category: Optional[str] = None,
         min_similarity: Optional[float] = None,
-    ) -> List[MemoryChunk]:
+        exclude_memory_id: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
         """
-        Find similar chunks using cosine distance.
+        Find the `limit` most similar distinct memories for a query embedding.
+        
+        Chunk distances are aggregated per memory (best chunk) inside SQL, so
+        chunk embeddings never leave the database. When the nearest chunks are
+        concentrated in a few long memories, the candidate window is widened
+        until `limit` distinct memories are found or no more candidates exist.
         
         Args:
             session: Database session
             embedding: Query embedding vector
-            limit: Maximum number of results
+            limit: Number of distinct memories to return
             category: Filter by memory category
             min_similarity: Minimum similarity threshold (0.0 to 1.0)
+            exclude_memory_id: Memory ID to exclude from results
+            ef_search: hnsw.ef_search set by the caller (otherwise raised to the window size)
             
         Returns:
-            List of similar MemoryChunk objects
+            List of (memory_id, similarity_score) tuples, sorted by score descending
         """
-        # Use cosine distance operator for semantic search
-        distance_expr = MemoryChunk.embedding.op("<=>")(embedding)
+        # similarity = (cos + 1) / 2 = 1 - distance / 2 for cosine distance
+        max_distance = 2.0 * (1.0 - min_similarity) if min_similarity is not None else None
+        exact = self._prepare_vector_scan(session, category)
+        
+        window = max(limit * config.search_candidate_factor, limit)
+        while True:
+            candidates = self._vector_candidates(
+                session,
+                embedding,
+                window,
+                category=category,
+                exact=exact,
+                exclude_memory_id=exclude_memory_id,
+                ef_search=ef_search,
+            )
+            
+            best_distance = func.min(candidates.c.distance)
+            stmt = (
+                select(
+                    candidates.c.memory_id,
+                    best_distance.label("distance"),
+                    func.sum(func.count()).over().label("candidate_count"),
+                    func.max(func.max(candidates.c.distance)).over().label("farthest"),
+                )
+                .group_by(candidates.c.memory_id)
+                .order_by(best_distance)
+                .limit(limit)
+            )
+            rows = session.execute(stmt).all()
+            
+            if exact or not rows or len(rows) >= limit:
+                break
+            # Stop widening when the index is exhausted, the threshold already
+            # excludes the farthest candidates, or the window hit its cap
+            exhausted = rows[0].candidate_count < window
+            beyond_threshold = max_distance is not None and rows[0].farthest > max_distance
+            if exhausted or beyond_threshold or window >= config.search_max_candidates:
+                break
+            window = min(window * 4, config.search_max_candidates)
+        
+        results = []
+        for row in rows:
+            if max_distance is not None and row.distance > max_distance:
+                break
+            similarity = max(0.0, min(1.0, 1.0 - float(row.distance) / 2.0))
+            results.append((row.memory_id, similarity))
+        return results
 
-        stmt = select(MemoryChunk).order_by(distance_expr)
+    def _hybrid_memory_scores(
+        self,
+        session: Session,
+        embedding: List[float],
+        lexical_query: str,
+        limit: int = 10,
+        category: Optional[str] = None,
+        min_similarity: Optional[float] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Rank memories by fusing vector and full-text retrieval in one query.
+        
+        Both sides are ranked independently (best chunk distance, ts_rank_cd on
+        memory.text) and combined with reciprocal rank fusion, so exact names,
+        numbers and acronyms are found even when their embeddings are not close.
+        
+        Args:
+            session: Database session
+            embedding: Query embedding vector
+            lexical_query: Raw query text for full-text matching (websearch syntax)
+            limit: Number of memories to return
+            category: Filter by memory category
+            min_similarity: Minimum vector similarity for the vector side (0.0 to 1.0)
+            ef_search: hnsw.ef_search set by the caller (otherwise raised to the window size)
+            
+        Returns:
+            List of (memory_id, fused_score) tuples, sorted by score descending.
+            Scores are normalized so a memory ranked first by both sides scores 1.0.
+        """
+        window = max(limit * config.search_candidate_factor, limit)
+        exact = self._prepare_vector_scan(session, category)
+        candidates = self._vector_candidates(
+            session,
+            embedding,
+            window,
+            category=category,
+            exact=exact,
+            ef_search=ef_search,
+        )
         
-        # Join with Memory if category filter is needed
+        best_distance = func.min(candidates.c.distance)
+        vector_ranked = (
+            select(
+                candidates.c.memory_id,
+                func.row_number().over(order_by=best_distance).label("rank"),
+            )
+            .group_by(candidates.c.memory_id)
+        )
+        if min_similarity is not None:
+            vector_ranked = vector_ranked.having(best_distance <= 2.0 * (1.0 - min_similarity))
+        vector_ranked = vector_ranked.cte("vector_ranked")
+        
+        # Same expression as idx_memory_text_fts so the GIN index is used
+        document = memory_text_search_vector(Memory.text)
+        ts_query = func.websearch_to_tsquery(text_search_regconfig(), lexical_query)
+        text_rank = func.ts_rank_cd(document, ts_query)
+        lexical_ranked = select(
+            Memory.id.label("memory_id"),
+            func.row_number().over(order_by=text_rank.desc()).label("rank"),
+        ).where(document.op("@@")(ts_query))
         if category:
-            stmt = stmt.join(Memory).where(Memory.category == category)
+            lexical_ranked = lexical_ranked.where(Memory.category == category)
+        lexical_ranked = lexical_ranked.order_by(text_rank.desc()).limit(window).cte("lexical_ranked")
         
-        stmt = stmt.limit(limit)
-
-        results = session.execute(stmt).scalars().all()
+        k = config.hybrid_rrf_k
+        fused_score = (
+            func.coalesce(1.0 / (k + vector_ranked.c.rank), 0.0)
+            + func.coalesce(1.0 / (k + lexical_ranked.c.rank), 0.0)
+        )
+        stmt = (
+            select(
+                func.coalesce(vector_ranked.c.memory_id, lexical_ranked.c.memory_id).label("memory_id"),
+                fused_score.label("score"),
+            )
+            .select_from(
+                vector_ranked.join(
+                    lexical_ranked,
+                    vector_ranked.c.memory_id == lexical_ranked.c.memory_id,
+                    full=True,
+                )
+            )
+            .order_by(fused_score.desc())
+            .limit(limit)
+        )
+        
+        best_possible = 2.0 / (k + 1)
+        return [
+            (row.memory_id, min(1.0, float(row.score) / best_possible))
+            for row in session.execute(stmt).all()
+        ]
 
-        # Apply similarity threshold if specified
+    def _hierarchical_memory_scores(
+        self,
+        session: Session,
+        embedding: List[float],
+        limit: int = 10,
+        category: Optional[str] = None,
+        min_similarity: Optional[float] = None,
+        candidate_memories: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Coarse-to-fine search in one query: the nearest memory centroids are
+        taken from the memory-level index, then only those memories' chunks
+        are ranked exactly. Avoids scanning the (much larger) chunk index.
+        
+        Args:
+            session: Database session
+            embedding: Query embedding vector
+            limit: Number of memories to return
+            category: Filter by memory category
+            min_similarity: Minimum best-chunk similarity threshold (0.0 to 1.0)
+            candidate_memories: Memories kept by the first stage (defaults to config.hierarchical_candidates)
+            ef_search: hnsw.ef_search set by the caller (otherwise raised to the candidate width)
+            
+        Returns:
+            List of (memory_id, similarity_score) tuples, sorted by score descending
+        """
+        width = max(candidate_memories or config.hierarchical_candidates, limit)
+        
+        centroid_distance = Memory.centroid_embedding.op("<=>")(embedding)
+        stage_one = select(Memory.id, centroid_distance.label("distance")).where(
+            Memory.centroid_embedding.is_not(None)
+        )
+        if category:
+            stage_one = stage_one.where(Memory.category == category)
+        self._prepare_vector_scan(session, category, allow_exact=False)
+        if ef_search is None:
+            ef = min(max(width, 40), config.max_ef_search)
+            session.execute(sql_text(f"SET LOCAL hnsw.ef_search = {ef}"))
+        candidate_ids = (
+            stage_one.order_by(centroid_distance)
+            .limit(width)
+            .cte("candidate_memories")
+            .prefix_with("MATERIALIZED")
+        )
+        
+        # Second stage: exact best-chunk distance within the candidate memories
+        best_distance = func.min(MemoryChunk.embedding.op("<=>")(embedding))
+        stmt = (
+            select(MemoryChunk.memory_id, best_distance.label("distance"))
+            .join(candidate_ids, candidate_ids.c.id == MemoryChunk.memory_id)
+            .group_by(MemoryChunk.memory_id)
+            .order_by(best_distance)
+            .limit(limit)
+        )
         if min_similarity is not None:
-            filtered_results = []
-            for chunk in results:
-                similarity = self._calculate_cosine_similarity(embedding, chunk.embedding)
-                if similarity >= min_similarity:
-                    filtered_results.append(chunk)
-            results = filtered_results
+            stmt = stmt.having(best_distance <= 2.0 * (1.0 - min_similarity))
+        
+        return [
+            (row.memory_id, max(0.0, min(1.0, 1.0 - float(row.distance) / 2.0)))
+            for row in session.execute(stmt).all()
+        ]
 
-        return results
+    def _graph_rank(self, seed_scores: Dict[int, float], limit: int) -> List[Tuple[int, float]]:
+        """
+        Rank memories associated with the vector hits by personalized PageRank
+        over the in-memory similarity graph (no extra ANN queries).
+        
+        Args:
+            seed_scores: Vector hits as memory_id -> similarity, used as personalization
+            limit: Number of memories to return
+            
+        Returns:
+            List of (memory_id, score) tuples, scores scaled so the top memory is 1.0
+        """
+        ranks = self.graph_store.personalized_pagerank(
+            seed_scores,
+            max_hops=config.graph_max_hops,
+            damping=config.graph_damping,
+            max_nodes=config.graph_max_nodes,
+            time_budget_ms=config.graph_time_budget_ms,
+        )
+        if not ranks:
+            return []
+        
+        top = heapq.nlargest(limit, ranks.items(), key=lambda item: item[1])
+        best = top[0][1] or 1.0
+        return [(memory_id, score / best) for memory_id, score in top]
+
+    def _mmr_rerank(
+        self,
+        session: Session,
+        memory_scores: List[Tuple[int, float]],
+        limit: int,
+        mmr_lambda: float,
+    ) -> List[Tuple[int, float]]:
+        """
+        Select a diverse subset of ranked memories by Maximal Marginal Relevance.
+        
+        Memories are compared through their centroid embeddings: the full
+        candidate-candidate similarity matrix is one float32 matmul, and each
+        greedy step updates every candidate's redundancy in one vector operation.
+        
+        Args:
+            session: Database session
+            memory_scores: Ranked (memory_id, relevance) candidates
+            limit: Number of memories to select
+            mmr_lambda: Relevance weight (1.0 = pure relevance, 0.0 = pure diversity)
+            
+        Returns:
+            Selected (memory_id, relevance) tuples in MMR order
+        """
+        if len(memory_scores) <= 1:
+            return memory_scores[:limit]
+        
+        centroids = dict(
+            session.execute(
+                select(Memory.id, Memory.centroid_embedding).where(
+                    Memory.id.in_([memory_id for memory_id, _ in memory_scores]),
+                    Memory.centroid_embedding.is_not(None),
+                )
+            ).all()
+        )
+        # Memories without a centroid can't be compared; keep them in relevance order
+        candidates = [(memory_id, score) for memory_id, score in memory_scores if memory_id in centroids]
+        if len(candidates) <= 1:
+            return memory_scores[:limit]
+        
+        embeddings = self._normalize_rows(
+            np.asarray([centroids[memory_id] for memory_id, _ in candidates], dtype=np.float32)
+        )
+        # Same 0..1 scale as the relevance scores
+        similarity = (embeddings @ embeddings.T + 1.0) / 2.0
+        relevance = np.asarray([score for _, score in candidates], dtype=np.float32)
+        
+        selected: List[int] = []
+        redundancy = np.zeros(len(candidates), dtype=np.float32)
+        available = np.ones(len(candidates), dtype=bool)
+        for _ in range(min(limit, len(candidates))):
+            mmr = mmr_lambda * relevance - (1.0 - mmr_lambda) * redundancy
+            mmr[~available] = -np.inf
+            best = int(np.argmax(mmr))
+            selected.append(best)
+            available[best] = False
+            np.maximum(redundancy, similarity[best], out=redundancy)
+        
+        reranked = [candidates[i] for i in selected]
+        if len(reranked) < limit:
+            chosen = {memory_id for memory_id, _ in reranked}
+            reranked += [item for item in memory_scores if item[0] not in chosen][:limit - len(reranked)]
+        return reranked
+
+    def _prepare_vector_scan(self, session: Session, category: Optional[str], allow_exact: bool = True) -> bool:
+        """
+        Pick the category filter strategy and set the matching scan options.
+        
+        Args:
+            session: Database session about to run the vector queries
+            category: Category filter, if any
+            allow_exact: Whether the caller can run an exact search; if not,
+                filtered searches always use iterative index scans
+            
+        Returns:
+            True if the search should be exact (small category), False for the ANN index
+        """
+        exact = bool(category) and allow_exact and self._choose_filter_strategy(category) == "exact"
+        if category and not exact and config.iterative_index_scan:
+            # Large category: keep scanning the ANN index until enough rows
+            # pass the filter instead of post-filtering a fixed candidate set
+            session.execute(sql_text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+            session.execute(sql_text("SET LOCAL ivfflat.iterative_scan = relaxed_order"))
+        return exact
+
+    def _vector_candidates(
+        self,
+        session: Session,
+        embedding: List[float],
+        window: int,
+        category: Optional[str] = None,
+        exact: bool = False,
+        exclude_memory_id: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ):
+        """
+        Build the nearest-chunk candidate set as a (memory_id, distance) selectable.
+        
+        Args:
+            session: Database session (receives SET LOCAL hnsw.ef_search)
+            embedding: Query embedding vector
+            window: Number of nearest chunks to take from the ANN index
+            category: Filter by memory category
+            exact: Rank every chunk of the category exactly instead of using the index
+            exclude_memory_id: Memory ID to exclude from the candidates
+            ef_search: hnsw.ef_search set by the caller (otherwise raised to the window size)
+            
+        Returns:
+            Subquery or CTE with memory_id and cosine distance columns
+        """
+        distance_expr = MemoryChunk.embedding.op("<=>")(embedding)
+        candidates = select(MemoryChunk.memory_id)
+        if category:
+            candidates = (
+                candidates.join(Memory, Memory.id == MemoryChunk.memory_id)
+                .where(Memory.category == category)
+            )
+        if exclude_memory_id is not None:
+            candidates = candidates.where(MemoryChunk.memory_id != exclude_memory_id)
+        
+        if exact:
+            # Small category: materialize all its chunks so the ANN index is
+            # bypassed and the ranking is exact over just those rows
+            return (
+                candidates.add_columns(distance_expr.label("distance"))
+                .cte("candidates")
+                .prefix_with("MATERIALIZED")
+            )
+        
+        coarse_limit = window
+        if config.vector_storage != "full":
+            coarse_limit = min(window * config.quantized_rerank_factor, config.search_max_candidates)
+        if ef_search is None:
+            # HNSW returns at most ef_search rows per scan
+            ef = min(max(coarse_limit, 40), config.max_ef_search)
+            session.execute(sql_text(f"SET LOCAL hnsw.ef_search = {ef}"))
+        
+        if config.vector_storage == "full":
+            return (
+                candidates.add_columns(distance_expr.label("distance"))
+                .order_by(distance_expr)
+                .limit(window)
+                .subquery("candidates")
+            )
+        
+        # Coarse stage on the quantized index, then exact rerank of
+        # its candidates on the full-precision embeddings
+        coarse = (
+            candidates.add_columns(MemoryChunk.embedding)
+            .order_by(self._quantized_distance(embedding))
+            .limit(coarse_limit)
+            .subquery("coarse")
+        )
+        rerank_distance = coarse.c.embedding.op("<=>")(embedding)
+        return (
+            select(coarse.c.memory_id, rerank_distance.label("distance"))
+            .order_by(rerank_distance)
+            .limit(window)
+            .subquery("candidates")
+        )
+
+    def _quantized_distance(self, embedding: List[float]):
+        """
+        Distance on the quantized representation matching the vector index expression.
+        
+        Args:
+            embedding: Query embedding vector, or a SQL expression holding one
+            
+        Returns:
+            SQL expression ordering chunks by their quantized distance to the query
+        """
+        dimensions = config.embedding_dimension
+        if config.vector_storage == "binary":
+            # Hamming distance between sign bits
+            query_bits = func.binary_quantize(cast(embedding, Vector(dimensions)))
+            return cast(func.binary_quantize(MemoryChunk.embedding), BIT(dimensions)).op("<~>")(query_bits)
+        return cast(MemoryChunk.embedding, HALFVEC(dimensions)).op("<=>")(
+            cast(embedding, HALFVEC(dimensions))
+        )
+
+    def _choose_filter_strategy(self, category: str) -> str:
+        """
+        Choose how to run a category-filtered vector search.
+        
+        ANN indexes filter after the approximate scan, so rare categories would
+        return too few rows. Small categories are searched exactly instead;
+        large ones use iterative index scans.
+        
+        Args:
+            category: The category filter
+            
+        Returns:
+            "exact" or "iterative"
+        """
+        memory_count = self.get_category_counts().get(category, 0)
+        estimated_chunks = memory_count * max(self._chunks_per_memory(), 1.0)
+        return "exact" if estimated_chunks <= config.exact_search_max_chunks else "iterative"
+
+    def _chunks_per_memory(self) -> float:
+        """
+        Average number of chunks per memory.
+        
+        Uses the maintained counters once /statistics has loaded them; until
+        then, the pg_class.reltuples estimate, refreshed every
+        config.stats_reconcile_interval seconds.
+        """
+        with self._cache_lock:
+            counters = self._stats_counters
+            if counters and counters["memories"] > 0:
+                return counters["chunks"] / counters["memories"]
+            cached = self._chunks_per_memory_estimate
+        if cached and time.monotonic() - cached[1] < config.stats_reconcile_interval:
+            return cached[0]
+        
+        try:
+            counters, _ = self._estimate_statistics()
+        except SQLAlchemyError:
+            return cached[0] if cached else 1.0
+        # reltuples is unknown (0 here) until the tables are first analyzed
+        ratio = counters["chunks"] / counters["memories"] if counters["memories"] > 0 else 1.0
+        with self._cache_lock:
+            self._chunks_per_memory_estimate = (ratio, time.monotonic())
+        return ratio
+
+    def _apply_search_knobs(
+        self,
+        session: Session,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+    ):
+        """
+        Set per-request vector index recall/latency knobs for the current transaction.
+        SET LOCAL scopes them to this session's transaction only.
+        
+        Args:
+            session: Database session about to run the vector queries
+            ef_search: HNSW candidate list size (higher = better recall, slower)
+            probes: IVFFlat lists to probe (higher = better recall, slower)
+            
+        Raises:
+            ValueError: If a knob is out of range
+        """
+        if ef_search is not None:
+            if not 1 <= ef_search <= config.max_ef_search:
+                raise ValueError(f"ef_search must be between 1 and {config.max_ef_search}")
+            session.execute(sql_text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+        if probes is not None:
+            if probes < 1:
+                raise ValueError("probes must be at least 1")
+            session.execute(sql_text(f"SET LOCAL ivfflat.probes = {int(probes)}"))
 
     def _enhance_query(self, query_text: str, context: Optional[List[str]] = None) -> str:
         """
@@ -956,10 +2043,23 @@ class RagMemoryService:
         min_similarity: Optional[float] = None,
         enhance_query: bool = True,
         query_context: Optional[List[str]] = None,
-    ) -> List[Tuple[Memory, float]]:
+        preview_chars: Optional[int] = None,
+        include_text: bool = True,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        search_mode: str = "vector",
+        candidate_memories: Optional[int] = None,
+        mmr_lambda: Optional[float] = None,
+        mmr_pool: Optional[int] = None,
+        include_chunks: bool = False,
+    ) -> List[Tuple]:
         """
         Search for memories similar to the query text.
         Query is chunked and compared against memory chunks.
+        In "hybrid" mode, full-text matches on the original query are fused in;
+        "hierarchical" mode ranks chunks of the nearest memory centroids only;
+        "graph" mode ranks the neighborhood of the vector hits by personalized PageRank.
+        Ranked results are cached until the next write to the service.
         
         Args:
             query_text: The text to search for
@@ -968,14 +2068,57 @@ class RagMemoryService:
             min_similarity: Minimum similarity threshold (0.0 to 1.0)
             enhance_query: Whether to use AI-powered query enhancement (default: True)
             query_context: Optional list of recent queries for better enhancement
+            preview_chars: Truncate result texts to this many characters (None for full text)
+            include_text: Whether to load result texts at all
+            ef_search: HNSW hnsw.ef_search for this request (trades latency for recall)
+            probes: IVFFlat ivfflat.probes for this request (trades latency for recall)
+            search_mode: "vector" (ANN only), "hybrid" (ANN + full-text, rank-fused scores)
+                or "hierarchical" (memory centroids, then their chunks)
+                or "graph" (vector hits expanded over the similarity graph)
+            candidate_memories: First-stage width for hierarchical mode (defaults to config)
+            mmr_lambda: Enable Maximal Marginal Relevance reranking with this relevance weight
+                (1.0 = pure relevance, lower = more diverse); None disables it
+            mmr_pool: Candidates considered by the MMR rerank (defaults to config.mmr_pool_size)
+            include_chunks: Also return each memory's best-matching chunks (see _matched_chunks)
             
         Returns:
-            List of (Memory, similarity_score) tuples, sorted by similarity descending
+            List of (Memory, similarity_score) tuples, sorted by similarity descending;
+            (Memory, similarity_score, matched_chunks) tuples when include_chunks is set
         """
         if not query_text or not query_text.strip():
             raise ValueError("Query text cannot be empty")
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"search_mode must be one of {', '.join(SEARCH_MODES)}")
+        if mmr_lambda is not None and not 0.0 <= mmr_lambda <= 1.0:
+            raise ValueError("mmr_lambda must be between 0.0 and 1.0")
         
         query_text = query_text.strip()
+        lexical_query = query_text
+        
+        # Serve repeated searches from the cache while no write has happened
+        cache_key = (
+            " ".join(query_text.split()).casefold(),
+            category,
+            limit,
+            min_similarity,
+            enhance_query,
+            tuple(query_context or ()) if enhance_query else (),
+            ef_search,
+            probes,
+            search_mode,
+            candidate_memories if search_mode == "hierarchical" else None,
+            mmr_lambda,
+            mmr_pool if mmr_lambda is not None else None,
+        )
+        with self._cache_lock:
+            generation = self._write_generation
+        cached = self._search_cache.get(cache_key)
+        if cached is not None and cached[0] == generation:
+            logger.debug("Search cache hit")
+            results = self._hydrate_search_results(cached[1], preview_chars, include_text)
+            if include_chunks:
+                return self._with_matched_chunks(results, cached[2])
+            return results
         
         # Enhance query if enabled
         if enhance_query:
@@ -996,53 +2139,88 @@ class RagMemoryService:
 
         session = self._get_session()
         try:
-            # Find similar chunks and aggregate by memory
-            memory_similarities: Dict[int, List[float]] = {}
+            self._apply_search_knobs(session, ef_search=ef_search, probes=probes)
+            
+            # Rank distinct memories per query chunk and keep the best score;
+            # MMR picks `limit` of a larger candidate pool
+            fetch_limit = limit
+            if mmr_lambda is not None:
+                fetch_limit = max(limit, mmr_pool or config.mmr_pool_size)
+            memory_similarities: Dict[int, float] = {}
             
             for query_embedding in query_embeddings:
-                similar_chunks = self._get_similar_chunks_by_embedding(
-                    session=session,
-                    embedding=query_embedding,
-                    limit=limit * 3,  # Get more chunks to ensure we have enough memories
-                    category=category,
-                    min_similarity=min_similarity,
-                )
-                
-                for chunk in similar_chunks:
-                    similarity = self._calculate_cosine_similarity(
-                        query_embedding,
-                        chunk.embedding,
+                if search_mode == "hybrid":
+                    # Lexical side uses the user's own words, not the enhanced rewrite
+                    scores = self._hybrid_memory_scores(
+                        session=session,
+                        embedding=query_embedding,
+                        lexical_query=lexical_query,
+                        limit=fetch_limit,
+                        category=category,
+                        min_similarity=min_similarity,
+                        ef_search=ef_search,
                     )
-                    
-                    if chunk.memory_id not in memory_similarities:
-                        memory_similarities[chunk.memory_id] = []
-                    memory_similarities[chunk.memory_id].append(similarity)
-            
-            # Aggregate similarities per memory (use max similarity)
-            memory_scores = []
-            for memory_id, similarities in memory_similarities.items():
-                max_similarity = max(similarities)
-                memory_scores.append((memory_id, max_similarity))
-            
-            # Sort by similarity descending and limit
-            memory_scores.sort(key=lambda x: x[1], reverse=True)
-            memory_scores = memory_scores[:limit]
-            
-            # Fetch memory objects
-            results = []
-            for memory_id, similarity in memory_scores:
-                memory = session.get(Memory, memory_id)
-                if memory:
-                    # Ensure all attributes are loaded before closing session
-                    _ = memory.id
-                    _ = memory.text
-                    _ = memory.created_at
-                    _ = memory.category
-                    _ = memory.source
-                    session.expunge(memory)
-                    results.append((memory, similarity))
+                elif search_mode == "hierarchical":
+                    scores = self._hierarchical_memory_scores(
+                        session=session,
+                        embedding=query_embedding,
+                        limit=fetch_limit,
+                        category=category,
+                        min_similarity=min_similarity,
+                        candidate_memories=candidate_memories,
+                        ef_search=ef_search,
+                    )
+                else:
+                    scores = self._search_memory_scores(
+                        session=session,
+                        embedding=query_embedding,
+                        # Graph mode seeds the walk from a wider set of vector hits
+                        limit=max(fetch_limit, config.graph_seed_count) if search_mode == "graph" else fetch_limit,
+                        category=category,
+                        min_similarity=min_similarity,
+                        ef_search=ef_search,
+                    )
+                for memory_id, similarity in scores:
+                    if similarity > memory_similarities.get(memory_id, -1.0):
+                        memory_similarities[memory_id] = similarity
+            
+            if search_mode == "graph":
+                # Expanded neighbors may fall outside the category; keep spares to filter
+                pool = fetch_limit * config.search_candidate_factor if category else fetch_limit
+                memory_scores = self._graph_rank(memory_similarities, pool)
+            else:
+                # Sort by similarity descending and limit
+                memory_scores = sorted(memory_similarities.items(), key=lambda x: x[1], reverse=True)
+                memory_scores = memory_scores[:fetch_limit]
+            
+            # Fetch memory objects in one query
+            memories = self._load_memories_by_ids(
+                session,
+                [memory_id for memory_id, _ in memory_scores],
+                preview_chars=preview_chars,
+                include_text=include_text,
+            )
+            if search_mode == "graph" and category:
+                memory_scores = [
+                    (memory_id, score)
+                    for memory_id, score in memory_scores
+                    if memory_id in memories and memories[memory_id].category == category
+                ][:fetch_limit]
+            
+            if mmr_lambda is not None:
+                memory_scores = self._mmr_rerank(session, memory_scores, limit, mmr_lambda)
+            results = [
+                (memories[memory_id], similarity)
+                for memory_id, similarity in memory_scores
+                if memory_id in memories
+            ]
+            
+            # Query embeddings are kept so cached results can still locate matched chunks
+            self._search_cache.put(cache_key, (generation, memory_scores, query_embeddings))
             
             logger.info(f"Found {len(results)} similar memories for query")
+            if include_chunks:
+                return self._with_matched_chunks(results, query_embeddings, session)
             return results
             
         except SQLAlchemyError as e:
@@ -1051,18 +2229,406 @@ class RagMemoryService:
         finally:
             session.close()
 
-    def search_by_category(self, category: str, limit: Optional[int] = None) -> List[Memory]:
+    def _with_matched_chunks(
+        self,
+        results: List[Tuple[Memory, float]],
+        query_embeddings: List[List[float]],
+        session: Optional[Session] = None,
+    ) -> List[Tuple[Memory, float, List[Dict[str, Any]]]]:
+        """Append each result's best-matching chunks (see _matched_chunks)."""
+        chunks_by_memory = self._matched_chunks(
+            [memory.id for memory, _ in results],
+            query_embeddings,
+            session=session,
+        )
+        return [
+            (memory, similarity, chunks_by_memory.get(memory.id, []))
+            for memory, similarity in results
+        ]
+
+    def _matched_chunks(
+        self,
+        memory_ids: List[int],
+        query_embeddings: List[List[float]],
+        per_memory: Optional[int] = None,
+        session: Optional[Session] = None,
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Find the chunks of each memory closest to the query, in one query.
+        
+        Args:
+            memory_ids: Memories to look in
+            query_embeddings: Query chunk embeddings (a chunk's distance is its closest one)
+            per_memory: Chunks to return per memory (defaults to config.matched_chunks_per_memory)
+            session: Database session to reuse (otherwise a new one is opened)
+            
+        Returns:
+            Dictionary mapping memory_id to its best chunks, each a dict with
+            chunk_id, chunk_index, text, similarity, start_word and end_word
+            (word offsets within the memory, as in TextChunker.get_chunk_info)
+        """
+        if not memory_ids or not query_embeddings:
+            return {}
+        per_memory = per_memory or config.matched_chunks_per_memory
+        
+        distances = [MemoryChunk.embedding.op("<=>")(embedding) for embedding in query_embeddings]
+        distance_expr = func.least(*distances) if len(distances) > 1 else distances[0]
+        ranked = (
+            select(
+                MemoryChunk.id,
+                MemoryChunk.memory_id,
+                MemoryChunk.chunk_index,
+                MemoryChunk.chunk_text,
+                distance_expr.label("distance"),
+                func.row_number().over(
+                    partition_by=MemoryChunk.memory_id,
+                    order_by=distance_expr,
+                ).label("rank"),
+            )
+            .where(MemoryChunk.memory_id.in_(memory_ids))
+            .subquery("ranked_chunks")
+        )
+        stmt = (
+            select(ranked)
+            .where(ranked.c.rank <= per_memory)
+            .order_by(ranked.c.memory_id, ranked.c.rank)
+        )
+        
+        owns_session = session is None
+        session = session or self._get_session()
+        try:
+            rows = session.execute(stmt).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error finding matched chunks: {e}")
+            raise
+        finally:
+            if owns_session:
+                session.close()
+        
+        chunks_by_memory: Dict[int, List[Dict[str, Any]]] = {}
+        for row in rows:
+            start_word, end_word = self.chunker.get_chunk_span(row.chunk_index, row.chunk_text)
+            chunks_by_memory.setdefault(row.memory_id, []).append({
+                "chunk_id": row.id,
+                "chunk_index": row.chunk_index,
+                "text": row.chunk_text,
+                "similarity": max(0.0, min(1.0, 1.0 - float(row.distance) / 2.0)),
+                "start_word": start_word,
+                "end_word": end_word,
+            })
+        return chunks_by_memory
+
+    def find_similar_to_memory(
+        self,
+        memory_id: int,
+        limit: int = 5,
+        category: Optional[str] = None,
+        min_similarity: Optional[float] = None,
+        method: str = "centroid",
+        preview_chars: Optional[int] = None,
+        include_text: bool = True,
+    ) -> Optional[List[Tuple[Memory, float]]]:
+        """
+        Find memories similar to a stored memory using its stored embeddings,
+        without calling the embeddings API. Unlike graph neighbors, results are
+        not capped by max_similar_connections or the edge threshold.
+        
+        Args:
+            memory_id: The memory to find similar memories for
+            limit: Maximum number of results
+            category: Filter results by category
+            min_similarity: Minimum similarity threshold (0.0 to 1.0)
+            method: "centroid" (one ANN query on memory centroids) or
+                "chunks" (nearest chunks of each stored chunk, best pair per memory).
+                Memories without a centroid (not enriched yet, or created before
+                centroids existed) are compared by chunks
+            preview_chars: Truncate result texts to this many characters (None for full text)
+            include_text: Whether to load result texts at all
+            
+        Returns:
+            List of (Memory, similarity_score) tuples sorted by similarity descending,
+            or None if the memory does not exist
+        """
+        if method not in ("centroid", "chunks"):
+            raise ValueError("method must be 'centroid' or 'chunks'")
+        
+        cache_key = ("similar", memory_id, limit, category, min_similarity, method)
+        with self._cache_lock:
+            generation = self._write_generation
+        cached = self._search_cache.get(cache_key)
+        if cached is not None and cached[0] == generation:
+            return self._hydrate_search_results(cached[1], preview_chars, include_text)
+        
+        window = max(limit * config.search_candidate_factor, limit)
+        # Chunk scans with quantized storage take more candidates from the
+        # quantized index; they are reranked at full precision below
+        scan_limit = window
+        if config.vector_storage != "full":
+            scan_limit = min(window * config.quantized_rerank_factor, config.search_max_candidates)
+        session = self._get_session()
+        try:
+            session.execute(sql_text(
+                f"SET LOCAL hnsw.ef_search = {min(max(scan_limit, 40), config.max_ef_search)}"
+            ))
+            self._prepare_vector_scan(session, category, allow_exact=False)
+            
+            has_centroid = session.execute(
+                select(Memory.centroid_embedding.is_not(None)).where(Memory.id == memory_id)
+            ).scalar()
+            if has_centroid is None:
+                return None
+            
+            if method == "centroid" and has_centroid:
+                # Scalar subquery runs once (InitPlan), so the ANN index is still used
+                source_memory = aliased(Memory)
+                source_centroid = (
+                    select(source_memory.centroid_embedding)
+                    .where(source_memory.id == memory_id)
+                    .scalar_subquery()
+                )
+                distance_expr = Memory.centroid_embedding.op("<=>")(source_centroid)
+                stmt = select(Memory.id.label("memory_id"), distance_expr.label("distance")).where(
+                    Memory.id != memory_id,
+                    Memory.centroid_embedding.is_not(None),
+                    distance_expr.is_not(None),
+                )
+                if category:
+                    stmt = stmt.where(Memory.category == category)
+                stmt = stmt.order_by(distance_expr).limit(limit)
+            else:
+                # For each stored chunk, its nearest chunks of other memories (LATERAL).
+                # The scan is ordered like the vector index expression; with quantized
+                # storage, taking the best full-precision distance reranks its candidates
+                source_chunk = aliased(MemoryChunk)
+                distance_expr = MemoryChunk.embedding.op("<=>")(source_chunk.embedding)
+                if config.vector_storage == "full":
+                    scan_order = distance_expr
+                else:
+                    scan_order = self._quantized_distance(source_chunk.embedding)
+                nearest = select(MemoryChunk.memory_id, distance_expr.label("distance")).where(
+                    MemoryChunk.memory_id != memory_id
+                )
+                if category:
+                    nearest = (
+                        nearest.join(Memory, Memory.id == MemoryChunk.memory_id)
+                        .where(Memory.category == category)
+                    )
+                nearest = nearest.order_by(scan_order).limit(scan_limit).lateral("nearest")
+                best_distance = func.min(nearest.c.distance)
+                stmt = (
+                    select(nearest.c.memory_id, best_distance.label("distance"))
+                    .select_from(source_chunk)
+                    .join(nearest, sql_true())
+                    .where(source_chunk.memory_id == memory_id)
+                    .group_by(nearest.c.memory_id)
+                    .order_by(best_distance)
+                    .limit(limit)
+                )
+            rows = session.execute(stmt).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error finding memories similar to {memory_id}: {e}")
+            raise
+        finally:
+            session.close()
+        
+        memory_scores = []
+        for row in rows:
+            similarity = max(0.0, min(1.0, 1.0 - float(row.distance) / 2.0))
+            if min_similarity is not None and similarity < min_similarity:
+                break
+            memory_scores.append((row.memory_id, similarity))
+        
+        self._search_cache.put(cache_key, (generation, memory_scores))
+        return self._hydrate_search_results(memory_scores, preview_chars, include_text)
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        category: Optional[str] = None,
+        min_similarity: Optional[float] = None,
+        preview_chars: Optional[int] = None,
+        include_text: bool = True,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+    ) -> List[List[Tuple[Memory, float]]]:
+        """
+        Search for several queries at once: one embeddings request, one SQL
+        statement for all ANN lookups (a LATERAL nearest-chunk scan per query)
+        and one query to load every result memory.
+        
+        Each query is embedded whole, without enhancement or chunking.
+        
+        Args:
+            queries: Query texts
+            limit: Maximum number of results per query
+            category: Filter by category
+            min_similarity: Minimum similarity threshold (0.0 to 1.0)
+            preview_chars: Truncate result texts to this many characters (None for full text)
+            include_text: Whether to load result texts at all
+            ef_search: HNSW hnsw.ef_search for this request (trades latency for recall)
+            probes: IVFFlat ivfflat.probes for this request (trades latency for recall)
+            
+        Returns:
+            One list of (Memory, similarity_score) tuples per query, in query order
+        """
+        if not queries:
+            return []
+        if len(queries) > config.max_batch_queries:
+            raise ValueError(f"At most {config.max_batch_queries} queries per batch")
+        queries = [query.strip() if query else "" for query in queries]
+        if not all(queries):
+            raise ValueError("Query text cannot be empty")
+        
+        try:
+            query_embeddings = self.embedding_generator.generate_embeddings_batch(queries)
+        except Exception as e:
+            logger.error(f"Failed to generate batch query embeddings: {e}")
+            raise
+        
+        window = max(limit * config.search_candidate_factor, limit)
+        session = self._get_session()
+        try:
+            self._apply_search_knobs(session, ef_search=ef_search, probes=probes)
+            
+            query_rows = values(
+                column("query_index", Integer),
+                column("embedding", Vector(config.embedding_dimension)),
+                name="queries",
+            ).data(list(enumerate(query_embeddings)))
+            
+            # VALUES parameters arrive untyped, so cast them back to vectors
+            query_embedding = cast(query_rows.c.embedding, Vector(config.embedding_dimension))
+            
+            # Nearest chunks per query; with quantized storage the scan is ordered on
+            # the quantized index and all its candidates are reranked at full precision
+            distance_expr = MemoryChunk.embedding.op("<=>")(query_embedding)
+            scan_limit = window
+            if config.vector_storage == "full":
+                scan_order = distance_expr
+            else:
+                scan_order = self._quantized_distance(query_embedding)
+                scan_limit = min(window * config.quantized_rerank_factor, config.search_max_candidates)
+            if ef_search is None:
+                ef = min(max(scan_limit, 40), config.max_ef_search)
+                session.execute(sql_text(f"SET LOCAL hnsw.ef_search = {ef}"))
+            self._prepare_vector_scan(session, category, allow_exact=False)
+            
+            nearest = select(MemoryChunk.memory_id, distance_expr.label("distance"))
+            if category:
+                nearest = (
+                    nearest.join(Memory, Memory.id == MemoryChunk.memory_id)
+                    .where(Memory.category == category)
+                )
+            nearest = nearest.order_by(scan_order).limit(scan_limit).lateral("nearest")
+            
+            best_distance = func.min(nearest.c.distance)
+            ranked = (
+                select(
+                    query_rows.c.query_index,
+                    nearest.c.memory_id,
+                    best_distance.label("distance"),
+                    func.row_number().over(
+                        partition_by=query_rows.c.query_index,
+                        order_by=best_distance,
+                    ).label("rank"),
+                )
+                .select_from(query_rows)
+                .join(nearest, sql_true())
+                .group_by(query_rows.c.query_index, nearest.c.memory_id)
+            )
+            if min_similarity is not None:
+                ranked = ranked.having(best_distance <= 2.0 * (1.0 - min_similarity))
+            ranked = ranked.subquery("ranked")
+            
+            rows = session.execute(
+                select(ranked.c.query_index, ranked.c.memory_id, ranked.c.distance)
+                .where(ranked.c.rank <= limit)
+                .order_by(ranked.c.query_index, ranked.c.rank)
+            ).all()
+            
+            memories = self._load_memories_by_ids(
+                session,
+                list({row.memory_id for row in rows}),
+                preview_chars=preview_chars,
+                include_text=include_text,
+            )
+        except SQLAlchemyError as e:
+            logger.error(f"Database error in batch search: {e}")
+            raise
+        finally:
+            session.close()
+        
+        results: List[List[Tuple[Memory, float]]] = [[] for _ in queries]
+        for row in rows:
+            if row.memory_id in memories:
+                similarity = max(0.0, min(1.0, 1.0 - float(row.distance) / 2.0))
+                results[row.query_index].append((memories[row.memory_id], similarity))
+        
+        logger.info(f"Batch search for {len(queries)} queries returned {len(rows)} results")
+        return results
+
+    def _hydrate_search_results(
+        self,
+        memory_scores: List[Tuple[int, float]],
+        preview_chars: Optional[int] = None,
+        include_text: bool = True,
+    ) -> List[Tuple[Memory, float]]:
+        """
+        Load the memories for a ranked list of (memory_id, score) in one query.
+        
+        Args:
+            memory_scores: Ranked (memory_id, similarity_score) tuples
+            preview_chars: Truncate texts to this many characters (None for full text)
+            include_text: Whether to load texts at all
+            
+        Returns:
+            List of (Memory, similarity_score) tuples in the same order
+        """
+        session = self._get_session()
+        try:
+            memories = self._load_memories_by_ids(
+                session,
+                [memory_id for memory_id, _ in memory_scores],
+                preview_chars=preview_chars,
+                include_text=include_text,
+            )
+            return [
+                (memories[memory_id], similarity)
+                for memory_id, similarity in memory_scores
+                if memory_id in memories
+            ]
+        except SQLAlchemyError as e:
+            logger.error(f"Database error hydrating search results: {e}")
+            raise
+        finally:
+            session.close()
+
+    def search_by_category(
+        self,
+        category: str,
+        limit: Optional[int] = None,
+        preview_chars: Optional[int] = None,
+        include_text: bool = True,
+    ) -> List[Memory]:
         """
         Search memories by category.
         
         Args:
             category: The category to search for
             limit: Maximum number of results
+            preview_chars: Truncate text to this many characters (None for full text)
+            include_text: Whether to load text at all
             
         Returns:
             List of Memory objects
         """
-        return self.get_all_memories(limit=limit, category=category)
+        return self.get_all_memories(
+            limit=limit,
+            category=category,
+            preview_chars=preview_chars,
+            include_text=include_text,
+        )
 
     # -------- Graph-level operations --------
 
@@ -1113,6 +2679,23 @@ class RagMemoryService:
         """
         return self.graph_store.get_neighbors(memory_id, limit=limit)
 
+    def get_memory_neighbors_batch(
+        self,
+        memory_ids: List[int],
+        limit: int = 5,
+    ) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        Get the most similar neighbors for a page of memories in one graph lookup.
+        
+        Args:
+            memory_ids: The memories to find neighbors for
+            limit: Maximum number of neighbors per memory
+            
+        Returns:
+            Dictionary mapping memory_id to a list of (neighbor_id, similarity_score) tuples
+        """
+        return self.graph_store.get_neighbors_batch(memory_ids, limit=limit)
+
     def get_memory_cluster(self, memory_id: int) -> List[int]:
         """
         Get all memories in the same connected component as the given memory.
@@ -1170,49 +2753,147 @@ class RagMemoryService:
         finally:
             session.close()
 
-    def get_graph_statistics(self) -> Dict[str, Any]:
+    def reconcile_statistics(self) -> None:
         """
-        Get statistics about the memory graph and chunks.
-        
-        Returns:
-            Dictionary with graph and chunk statistics
+        Recompute the maintained statistics counters with exact queries.
+        Called periodically from get_graph_statistics to correct any drift
+        from concurrent writes.
         """
-        graph_stats = self.graph_store.get_graph_stats()
+        with self._cache_lock:
+            generation = self._write_generation
         
         session = self._get_session()
         try:
             total_memories = session.execute(select(func.count(Memory.id))).scalar() or 0
             total_edges = session.execute(select(func.count(MemoryEdge.source_id))).scalar() or 0
             total_chunks = session.execute(select(func.count(MemoryChunk.id))).scalar() or 0
-            
-            # Calculate average chunks per memory
-            avg_chunks = total_chunks / total_memories if total_memories > 0 else 0
-            
-            # Get category distribution
-            category_counts = session.execute(
+            category_rows = session.execute(
                 select(Memory.category, func.count(Memory.id))
                 .group_by(Memory.category)
             ).all()
-            
-            return {
-                "total_memories": total_memories,
-                "total_chunks": total_chunks,
-                "average_chunks_per_memory": round(avg_chunks, 2),
-                "total_edges": total_edges,
-                "graph_nodes": graph_stats["nodes"],
-                "graph_edges": graph_stats["edges"],
-                "connected_components": graph_stats["connected_components"],
-                "average_degree": graph_stats["average_degree"],
-                "graph_density": graph_stats["density"],
-                "categories": {cat or "uncategorized": count for cat, count in category_counts},
+        except SQLAlchemyError as e:
+            logger.error(f"Database error reconciling statistics: {e}")
+            raise
+        finally:
+            session.close()
+        
+        with self._cache_lock:
+            # A write during the recount makes the result unreliable; retry next time
+            if generation != self._write_generation:
+                return
+            self._stats_counters = {
+                "memories": total_memories,
+                "chunks": total_chunks,
+                "edges": total_edges,
             }
+            self._category_counts = {category: count for category, count in category_rows}
+            self._stats_reconciled_at = self._category_counts_at = time.monotonic()
+        
+        logger.debug("Statistics counters reconciled")
+
+    def _estimate_statistics(self) -> Tuple[Dict[str, int], Dict[Optional[str], int]]:
+        """
+        Estimate table and category counts from the PostgreSQL catalog
+        (pg_class.reltuples and pg_stats) without scanning any table.
+        
+        Returns:
+            Tuple of (counters, category_counts) estimates
+        """
+        session = self._get_session()
+        try:
+            rows = session.execute(
+                sql_text(
+                    "SELECT relname, reltuples FROM pg_class "
+                    "WHERE relname IN ('memory', 'memory_chunk', 'memory_edge') AND relkind = 'r'"
+                )
+            ).all()
+            reltuples = {name: max(int(estimate), 0) for name, estimate in rows}
+            counters = {
+                "memories": reltuples.get("memory", 0),
+                "chunks": reltuples.get("memory_chunk", 0),
+                "edges": reltuples.get("memory_edge", 0),
+            }
+            
+            # Most-common-values statistics cover the small, fixed category set
+            mcv = session.execute(
+                sql_text(
+                    "SELECT most_common_vals::text::text[], most_common_freqs, null_frac "
+                    "FROM pg_stats WHERE tablename = 'memory' AND attname = 'category'"
+                )
+            ).first()
+            category_counts: Dict[Optional[str], int] = {}
+            if mcv:
+                values, freqs, null_frac = mcv
+                for value, freq in zip(values or [], freqs or []):
+                    category_counts[value] = round(freq * counters["memories"])
+                if null_frac:
+                    category_counts[None] = round(null_frac * counters["memories"])
+            
+            return counters, category_counts
             
         except SQLAlchemyError as e:
-            logger.error(f"Database error getting statistics: {e}")
+            logger.error(f"Database error estimating statistics: {e}")
             raise
         finally:
             session.close()
 
+    def get_graph_statistics(self, approximate: bool = False) -> Dict[str, Any]:
+        """
+        Get statistics about the memory graph and chunks.
+        
+        Counts are maintained on the write paths, so this is O(1) in the common
+        case. In exact mode the counters are reconciled with real counts every
+        config.stats_reconcile_interval seconds. In approximate mode no table is
+        ever scanned: cold counters are estimated from catalog statistics.
+        
+        Args:
+            approximate: Whether to avoid exact recounts entirely
+            
+        Returns:
+            Dictionary with graph and chunk statistics
+        """
+        graph_stats = self.graph_store.get_graph_stats()
+        
+        with self._cache_lock:
+            counters = dict(self._stats_counters) if self._stats_counters is not None else None
+            category_counts = dict(self._category_counts) if self._category_counts is not None else None
+            stale = time.monotonic() - self._stats_reconciled_at > config.stats_reconcile_interval
+        
+        if approximate:
+            if counters is None or category_counts is None:
+                estimated_counters, estimated_categories = self._estimate_statistics()
+                counters = counters or estimated_counters
+                category_counts = category_counts if category_counts is not None else estimated_categories
+        elif counters is None or stale:
+            self.reconcile_statistics()
+            with self._cache_lock:
+                counters = dict(self._stats_counters) if self._stats_counters is not None else None
+                category_counts = dict(self._category_counts) if self._category_counts is not None else None
+            if counters is None:
+                # A concurrent write invalidated the recount; fall back to estimates
+                counters, category_counts = self._estimate_statistics()
+                approximate = True
+        
+        total_memories = counters["memories"]
+        total_chunks = counters["chunks"]
+        
+        # Calculate average chunks per memory
+        avg_chunks = total_chunks / total_memories if total_memories > 0 else 0
+        
+        return {
+            "total_memories": total_memories,
+            "total_chunks": total_chunks,
+            "average_chunks_per_memory": round(avg_chunks, 2),
+            "total_edges": counters["edges"],
+            "graph_nodes": graph_stats["nodes"],
+            "graph_edges": graph_stats["edges"],
+            "connected_components": graph_stats["connected_components"],
+            "average_degree": graph_stats["average_degree"],
+            "graph_density": graph_stats["density"],
+            "categories": {cat or "uncategorized": count for cat, count in category_counts.items()},
+            "approximate": approximate,
+        }
+
     def export_graph_json(
         self,
         max_nodes: int = 500,
@@ -1292,6 +2973,33 @@ class RagMemoryService:
         finally:
             session.close()
 
+    def get_vector_index_info(self) -> Optional[Dict[str, Any]]:
+        """
+        Describe the vector index on memory chunk embeddings.
+        
+        Returns:
+            Dictionary with name, method, definition, validity and size, or None if missing
+        """
+        return self.vector_index.get_info()
+
+    def rebuild_vector_index(self, method: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Rebuild the chunk and memory centroid vector indexes concurrently with
+        parameters scaled to the current data size. Searches keep running during
+        the build, but this call blocks until both indexes are ready (minutes on
+        large tables), so run it off the event loop.
+        
+        Args:
+            method: "hnsw" or "ivfflat" (defaults to config.vector_index_method)
+            
+        Returns:
+            Information about the rebuilt chunk index
+        """
+        method = method or config.vector_index_method
+        info = self.vector_index.build(method, rebuild=True)
+        self.centroid_index.build(method, rebuild=True)
+        return info
+
     def rebuild_graph(self):
         """
         Rebuild the entire in-memory graph from the database.
@@ -0,0 +1,171 @@
+"""
+Re-embed stored memory chunks at a new embedding dimension.
+
+Usage:
+    python reembed.py --dimensions 512 [--batch-size 100]
+
+The new embeddings are written to a temporary column in batches while the
+service keeps searching the current one. The columns are then swapped in a
+single transaction (re-embedding any chunks added in the meantime), memory
+centroids are recomputed and the vector indexes are rebuilt. Set RAG_EMBEDDING_DIMENSION to the same value and
+restart the service afterwards.
+"""
+import argparse
+import logging
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import bindparam, column, table, text, update
+from sqlalchemy.engine import Connection
+
+from config import config
+from database import engine
+from embeddings import EmbeddingGenerator
+from rag_service import RagMemoryService
+from vector_index import VectorIndexManager
+
+logger = logging.getLogger(__name__)
+
+TEMP_COLUMN = "embedding_reembed"
+
+
+def _prepare_column(conn: Connection, dimensions: int):
+    """Create the temporary column, recreating it if a previous run used another size."""
+    current_type = conn.execute(
+        text(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = 'memory_chunk'::regclass AND attname = :name AND NOT attisdropped"
+        ),
+        {"name": TEMP_COLUMN},
+    ).scalar()
+
+    if current_type == f"vector({dimensions})":
+        logger.info(f"Resuming re-embedding into existing {TEMP_COLUMN} column")
+        return
+    if current_type is not None:
+        conn.execute(text(f"ALTER TABLE memory_chunk DROP COLUMN {TEMP_COLUMN}"))
+    conn.execute(text(f"ALTER TABLE memory_chunk ADD COLUMN {TEMP_COLUMN} vector({dimensions})"))
+
+
+def _reembed_pending(
+    conn: Connection,
+    generator: EmbeddingGenerator,
+    dimensions: int,
+    batch_size: int,
+    commit: bool = True,
+) -> int:
+    """
+    Embed every chunk whose temporary column is still empty, in id order.
+
+    Args:
+        conn: Database connection
+        generator: Embedding generator configured with the new dimensions
+        dimensions: New embedding dimension
+        batch_size: Chunks per embeddings request
+        commit: Commit after every batch (so an interrupted run can resume)
+
+    Returns:
+        Number of chunks re-embedded
+    """
+    chunks = table("memory_chunk", column("id"), column(TEMP_COLUMN, Vector(dimensions)))
+    stmt = (
+        update(chunks)
+        .where(chunks.c.id == bindparam("chunk_id"))
+        .values({TEMP_COLUMN: bindparam("embedding")})
+    )
+
+    total = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            text(
+                f"SELECT id, chunk_text FROM memory_chunk "
+                f"WHERE {TEMP_COLUMN} IS NULL AND id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": batch_size},
+        ).all()
+        if not rows:
+            return total
+
+        embeddings = generator.generate_embeddings_batch([row.chunk_text for row in rows])
+        conn.execute(
+            stmt,
+            [
+                {"chunk_id": row.id, "embedding": embedding}
+                for row, embedding in zip(rows, embeddings)
+            ],
+        )
+        if commit:
+            conn.commit()
+
+        total += len(rows)
+        last_id = rows[-1].id
+        logger.info(f"Re-embedded {total} chunks")
+
+
+def reembed(dimensions: int, batch_size: int = 100):
+    """
+    Re-embed all chunks at `dimensions`, swap the embedding column and rebuild the index.
+
+    Args:
+        dimensions: New embedding dimension
+        batch_size: Chunks per embeddings request
+    """
+    generator = EmbeddingGenerator(
+        model_name=config.embedding_model,
+        cache_enabled=False,
+        dimensions=dimensions,
+    )
+
+    with engine.connect() as conn:
+        _prepare_column(conn, dimensions)
+        conn.commit()
+
+        # Bulk of the work, while the service keeps using the current column
+        _reembed_pending(conn, generator, dimensions, batch_size)
+
+        # Block writes, catch up on chunks added meanwhile and swap the columns
+        conn.execute(text("LOCK TABLE memory_chunk IN SHARE ROW EXCLUSIVE MODE"))
+        caught_up = _reembed_pending(conn, generator, dimensions, batch_size, commit=False)
+
+        # Dropping the old columns also drops their vector indexes; centroids
+        # are derived from the chunks and recomputed below
+        conn.execute(text("ALTER TABLE memory_chunk DROP COLUMN embedding"))
+        conn.execute(text(f"ALTER TABLE memory_chunk RENAME COLUMN {TEMP_COLUMN} TO embedding"))
+        conn.execute(text("ALTER TABLE memory DROP COLUMN IF EXISTS centroid_embedding"))
+        # Intent routing examples are re-embedded by the service when it loads them
+        conn.execute(text(
+            f"ALTER TABLE IF EXISTS intent_decision ALTER COLUMN embedding TYPE vector({dimensions}) USING NULL"
+        ))
+        conn.commit()
+        logger.info(f"Swapped in {dimensions}-dimension embeddings ({caught_up} caught up)")
+
+    RagMemoryService.backfill_memory_centroids(dimensions)
+
+    maintenance_work_mem = config.vector_index_maintenance_work_mem or None
+    VectorIndexManager(
+        engine,
+        maintenance_work_mem=maintenance_work_mem,
+        storage=config.vector_storage,
+        dimensions=dimensions,
+    ).build(config.vector_index_method, rebuild=True)
+    VectorIndexManager(
+        engine,
+        table="memory",
+        column="centroid_embedding",
+        index_name="idx_memory_centroid_cosine",
+        maintenance_work_mem=maintenance_work_mem,
+        dimensions=dimensions,
+    ).build(config.vector_index_method, rebuild=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-embed memory chunks at a new embedding dimension")
+    parser.add_argument("--dimensions", type=int, required=True, help="New embedding dimension (e.g. 512)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Chunks per embeddings request")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=config.log_level)
+    reembed(args.dimensions, args.batch_size)
@@ -0,0 +1,229 @@
+"""
+Vector index management for memory chunk embeddings.
+Chooses between HNSW and IVFFlat, scales build parameters to the table size
+and (re)builds indexes concurrently so searches keep running.
+
+The index can be built over the full-precision embeddings or over a
+quantized expression (halfvec or binary), which searches rerank on full precision.
+"""
+from typing import Any, Dict, Optional
+import logging
+import math
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_METHODS = ("hnsw", "ivfflat")
+VECTOR_STORAGE_MODES = ("full", "halfvec", "binary")
+
+# Operator class indexed for each storage mode
+STORAGE_OPERATOR_CLASSES = {
+    "full": "vector_cosine_ops",
+    "halfvec": "halfvec_cosine_ops",
+    "binary": "bit_hamming_ops",
+}
+
+
+class VectorIndexManager:
+    """
+    Creates, inspects and rebuilds the vector index on memory_chunk.embedding.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        table: str = "memory_chunk",
+        column: str = "embedding",
+        index_name: str = "idx_memory_chunk_embedding_cosine",
+        maintenance_work_mem: Optional[str] = None,
+        storage: str = "full",
+        dimensions: int = 1536,
+    ):
+        """
+        Initialize the index manager.
+        
+        Args:
+            engine: SQLAlchemy engine for the vector database
+            table: Table holding the embeddings
+            column: Vector column to index
+            index_name: Name of the managed index
+            maintenance_work_mem: Optional maintenance_work_mem for index builds (e.g. "1GB")
+            storage: "full" (vector), "halfvec" (half precision) or "binary" (Hamming on bits)
+            dimensions: Embedding dimensions, needed for the quantized expressions
+        """
+        if storage not in VECTOR_STORAGE_MODES:
+            raise ValueError(f"storage must be one of {', '.join(VECTOR_STORAGE_MODES)}")
+        self.engine = engine
+        self.table = table
+        self.column = column
+        self.index_name = index_name
+        self.maintenance_work_mem = maintenance_work_mem
+        self.storage = storage
+        self.dimensions = dimensions
+
+    @staticmethod
+    def build_parameters(method: str, row_count: int) -> Dict[str, int]:
+        """
+        Choose index build parameters scaled to the number of rows,
+        following pgvector's recommendations.
+        
+        Args:
+            method: "hnsw" or "ivfflat"
+            row_count: Number of rows to index
+            
+        Returns:
+            Dictionary of index WITH parameters
+        """
+        if method == "ivfflat":
+            # rows / 1000 lists up to 1M rows, sqrt(rows) beyond
+            if row_count <= 1_000_000:
+                lists = max(1, row_count // 1000)
+            else:
+                lists = int(math.sqrt(row_count))
+            return {"lists": lists}
+        
+        if method == "hnsw":
+            if row_count < 100_000:
+                return {"m": 16, "ef_construction": 64}
+            if row_count < 1_000_000:
+                return {"m": 16, "ef_construction": 128}
+            return {"m": 24, "ef_construction": 200}
+        
+        raise ValueError(f"Unknown vector index method: {method}")
+
+    def _index_target(self) -> str:
+        # Quantized modes index an expression, so the heap keeps full precision for reranking
+        opclass = STORAGE_OPERATOR_CLASSES[self.storage]
+        if self.storage == "halfvec":
+            return f"(({self.column})::halfvec({self.dimensions})) {opclass}"
+        if self.storage == "binary":
+            return f"((binary_quantize({self.column}))::bit({self.dimensions})) {opclass}"
+        return f"{self.column} {opclass}"
+
+    def _index_sql(self, name: str, method: str, params: Dict[str, int]) -> str:
+        with_clause = ", ".join(f"{key} = {int(value)}" for key, value in params.items())
+        return (
+            f"CREATE INDEX CONCURRENTLY {name} ON {self.table} "
+            f"USING {method} ({self._index_target()}) WITH ({with_clause})"
+        )
+
+    def get_info(self) -> Optional[Dict[str, Any]]:
+        """
+        Describe the managed index.
+        
+        Returns:
+            Dictionary with name, method, definition, validity, size and storage, or None if missing
+        """
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                text(
+                    "SELECT i.relname AS name, am.amname AS method, "
+                    "pg_get_indexdef(i.oid) AS definition, ix.indisvalid AS valid, "
+                    "pg_relation_size(i.oid) AS size_bytes "
+                    "FROM pg_class i "
+                    "JOIN pg_index ix ON ix.indexrelid = i.oid "
+                    "JOIN pg_am am ON am.oid = i.relam "
+                    "WHERE i.relname = :name"
+                ),
+                {"name": self.index_name},
+            ).mappings().first()
+        if not row:
+            return None
+        info = dict(row)
+        info["storage"] = next(
+            (mode for mode, opclass in STORAGE_OPERATOR_CLASSES.items() if opclass in info["definition"]),
+            None,
+        )
+        return info
+
+    def check(self) -> Optional[Dict[str, Any]]:
+        """
+        Log a warning if the index is missing, invalid (e.g. an interrupted
+        concurrent build) or built for another storage mode. Never builds anything.
+        
+        Returns:
+            Information about the index, or None if missing
+        """
+        info = self.get_info()
+        if not info:
+            logger.warning(
+                f"Vector index {self.index_name} is missing; searches on {self.table}.{self.column} "
+                f"fall back to sequential scans. Apply the migrations or POST /rebuild-vector-index"
+            )
+        elif not info["valid"]:
+            logger.warning(f"Vector index {self.index_name} is invalid; POST /rebuild-vector-index to rebuild it")
+        elif info["storage"] != self.storage:
+            logger.warning(
+                f"Vector index {self.index_name} uses {info['storage']} storage but "
+                f"{self.storage} is configured; rebuild it so searches can use the index"
+            )
+        return info
+
+    def _count_rows(self, conn) -> int:
+        return conn.execute(text(f"SELECT count(*) FROM {self.table}")).scalar() or 0
+
+    def build(self, method: str, rebuild: bool = False) -> Dict[str, Any]:
+        """
+        Create the index, or rebuild it with fresh parameters, without
+        blocking writes (CREATE/DROP INDEX CONCURRENTLY).
+        
+        A rebuild creates the new index under a temporary name, then swaps it in,
+        so searches keep using the old index until the new one is ready. Builds
+        of the same index are serialized with an advisory lock, since they share
+        the temporary name.
+        
+        Args:
+            method: "hnsw" or "ivfflat"
+            rebuild: Replace an existing index (otherwise an existing index is kept)
+            
+        Returns:
+            Information about the resulting index
+            
+        Raises:
+            ValueError: If the method is unknown or another build of this index is running
+        """
+        if method not in VECTOR_INDEX_METHODS:
+            raise ValueError(f"method must be one of {', '.join(VECTOR_INDEX_METHODS)}")
+        
+        existing = self.get_info()
+        if existing and existing["valid"] and not rebuild:
+            logger.info(f"Vector index {self.index_name} already exists ({existing['method']})")
+            if existing["storage"] != self.storage:
+                logger.warning(
+                    f"Vector index {self.index_name} uses {existing['storage']} storage but "
+                    f"{self.storage} is configured; rebuild it so searches can use the index"
+                )
+            return existing
+        
+        temp_name = f"{self.index_name}_new"
+        # Concurrent index builds cannot run inside a transaction block
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            # Session-level lock, held until released below or the connection drops
+            locked = conn.execute(
+                text("SELECT pg_try_advisory_lock(hashtext(:name))"), {"name": self.index_name}
+            ).scalar()
+            if not locked:
+                raise ValueError(f"A build of vector index {self.index_name} is already running")
+            try:
+                if self.maintenance_work_mem:
+                    conn.execute(
+                        text("SELECT set_config('maintenance_work_mem', :value, false)"),
+                        {"value": self.maintenance_work_mem},
+                    )
+                
+                row_count = self._count_rows(conn)
+                params = self.build_parameters(method, row_count)
+                logger.info(f"Building {method} index ({self.storage}) on {row_count} rows with {params}")
+                
+                # Leftover from an interrupted build
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {temp_name}"))
+                conn.execute(text(self._index_sql(temp_name, method, params)))
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {self.index_name}"))
+                conn.execute(text(f"ALTER INDEX {temp_name} RENAME TO {self.index_name}"))
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": self.index_name})
+        
+        logger.info(f"Vector index {self.index_name} ready")
+        return self.get_info()
@@ -0,0 +1,9 @@
+-- ============================================================================
+-- Paginación keyset para GET /memories
+-- Permite paginar con WHERE (created_at, id) < (:created_at, :id) en lugar de
+-- OFFSET, de modo que las páginas profundas cuestan lo mismo que la primera.
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_memory_created_at_id ON memory (created_at DESC, id DESC);
+
+COMMENT ON INDEX idx_memory_created_at_id IS 'Índice para paginación keyset (cursor) ordenada por created_at, id';
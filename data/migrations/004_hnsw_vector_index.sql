@@ -0,0 +1,16 @@
+-- ============================================================================
+-- Reemplaza el índice IVFFlat fijo (lists = 100) de 001_init_rag.sql por HNSW
+-- IVFFlat entrenado sobre una tabla vacía da mal recall; HNSW no necesita
+-- datos previos. Para bases con datos en producción es preferible usar
+-- POST /rebuild-vector-index, que construye el índice con CONCURRENTLY y
+-- escala los parámetros al número de chunks.
+-- ============================================================================
+
+DROP INDEX IF EXISTS idx_memory_chunk_embedding_cosine;
+
+CREATE INDEX idx_memory_chunk_embedding_cosine
+ON memory_chunk
+USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+COMMENT ON INDEX idx_memory_chunk_embedding_cosine IS 'Índice HNSW de distancia coseno; ajustar hnsw.ef_search por consulta';
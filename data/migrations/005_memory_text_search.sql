@@ -0,0 +1,13 @@
+-- ============================================================================
+-- Índice full-text sobre memory.text para la búsqueda híbrida
+-- (GET /search?mode=hybrid): combina el ranking léxico (ts_rank_cd) con el
+-- vectorial mediante reciprocal rank fusion, de modo que nombres, números y
+-- siglas exactas se encuentran sin reescribir la consulta con el LLM.
+-- La expresión debe coincidir con la del servicio (text_search_config).
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_memory_text_fts
+ON memory
+USING GIN (to_tsvector('spanish'::regconfig, text));
+
+COMMENT ON INDEX idx_memory_text_fts IS 'Índice full-text en español para el lado léxico de la búsqueda híbrida';
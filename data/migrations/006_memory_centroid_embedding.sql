@@ -0,0 +1,31 @@
+-- ============================================================================
+-- Embedding resumen por memoria (centroide): media de los embeddings
+-- normalizados de sus chunks. Al crear una memoria, los candidatos para las
+-- aristas del grafo salen de una sola consulta ANN sobre esta columna, en
+-- lugar de una consulta por chunk.
+-- Requiere pgvector >= 0.7 (l2_normalize).
+-- La dimensión (1536) es la de memory_chunk.embedding en 001. Si los chunks
+-- ya se re-embebieron a otra dimensión, el UPDATE falla por tipos distintos:
+-- en ese caso ejecutar `python reembed.py --dimensions <N>` (con
+-- RAG_EMBEDDING_DIMENSION=<N>), que recrea esta columna e índice a <N>.
+-- ============================================================================
+
+ALTER TABLE memory ADD COLUMN IF NOT EXISTS centroid_embedding VECTOR(1536);
+
+-- Calcular el centroide de las memorias existentes
+UPDATE memory
+SET centroid_embedding = c.centroid
+FROM (
+    SELECT memory_id, avg(l2_normalize(embedding)) AS centroid
+    FROM memory_chunk
+    GROUP BY memory_id
+) AS c
+WHERE memory.id = c.memory_id
+  AND memory.centroid_embedding IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_memory_centroid_cosine
+ON memory
+USING hnsw (centroid_embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+COMMENT ON COLUMN memory.centroid_embedding IS 'Media de los embeddings normalizados de los chunks; candidatos de aristas con una sola consulta ANN';
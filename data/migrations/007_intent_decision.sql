@@ -0,0 +1,20 @@
+-- ============================================================================
+-- Decisiones de intención (guardar / preguntar) de /process que sirven como
+-- ejemplos de entrenamiento del router local: las del LLM (tool calling), las
+-- elegidas explícitamente por el usuario (force_action) y las auditorías.
+-- El router clasifica por vecinos más cercanos sobre estos embeddings y solo
+-- llama al LLM cuando no está seguro.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS intent_decision (
+    id SERIAL PRIMARY KEY,
+    text TEXT NOT NULL,
+    intent VARCHAR(10) NOT NULL,
+    decider VARCHAR(20) NOT NULL,
+    embedding VECTOR(1536),
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+COMMENT ON TABLE intent_decision IS 'Decisiones de intención confiables usadas para entrenar el router local de /process';
+COMMENT ON COLUMN intent_decision.decider IS 'Origen de la etiqueta: tool_calling, override o audit';
+COMMENT ON COLUMN intent_decision.embedding IS 'Embedding del texto; NULL se recalcula al cargar (p. ej. tras cambiar la dimensión)';
@@ -0,0 +1,30 @@
+-- ============================================================================
+-- Ingesta en segundo plano: POST /memories/jobs guarda el texto de la memoria
+-- y un job en un solo INSERT y responde 202. Los workers del servicio hacen
+-- el enriquecimiento (categoría, chunks con embeddings y aristas del grafo)
+-- con reintentos, y registran el estado aquí.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS ingest_job (
+    id SERIAL PRIMARY KEY,
+    -- NULL si la memoria se borra: el job queda como failed con el motivo
+    memory_id INTEGER REFERENCES memory(id) ON DELETE SET NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    auto_categorize BOOLEAN NOT NULL DEFAULT true,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ,
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingest_job_memory_id ON ingest_job (memory_id);
+
+-- Los jobs pendientes (o running con lease vencido) se retoman al iniciar el servicio
+CREATE INDEX IF NOT EXISTS idx_ingest_job_status ON ingest_job (status);
+
+COMMENT ON TABLE ingest_job IS 'Enriquecimiento en segundo plano de memorias guardadas solo con su texto';
+COMMENT ON COLUMN ingest_job.status IS 'pending, running, succeeded o failed';
+COMMENT ON COLUMN ingest_job.started_at IS 'Inicio del intento en curso; un job running con este lease vencido se puede retomar';
+COMMENT ON COLUMN ingest_job.error IS 'Último error (se conserva si el job termina en failed)';